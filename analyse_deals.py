@@ -0,0 +1,163 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+
+import engine
+from solver import Solver
+
+# the columns of the results, one row per deal
+fields = ["seed", "draw_count", "status", "moves", "nodes", "seconds"]
+
+# the solver of each worker process, created by start_worker()
+worker_solver = None
+
+
+def start_worker(max_nodes, max_seconds):
+    """
+    Prepare a worker process of the pool.
+
+    Args:
+        max_nodes: node limit of the solver
+        max_seconds: time limit of the solver
+
+    Returns:
+        None
+    """
+    global worker_solver
+    worker_solver = Solver(max_nodes, max_seconds)
+
+
+def analyse_deal(task):
+    """
+    Deal a seed as the game deals it and solve it (in a worker process).
+
+    Args:
+        task: (seed, draw_count)
+
+    Returns:
+        The result row, a dictionary with the fields.
+    """
+    seed, draw_count = task
+    start = time.perf_counter()
+    result = worker_solver.solve(engine.seeded_game(seed, draw_count))
+    return {
+        "seed": seed,
+        "draw_count": draw_count,
+        "status": result.status,
+        "moves": len(result.moves) if result.moves is not None else "",
+        "nodes": result.nodes,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def completed_seeds(filename):
+    """
+    Read the seeds already in a results file, so an interrupted run can go on
+    where it stopped. A last line cut by the interruption is removed from the file.
+
+    Args:
+        filename: the CSV (or .jsonl) results file
+
+    Returns:
+        The set of (seed, draw_count) already analysed.
+    """
+    if not os.path.exists(filename):
+        return set()
+
+    with open(filename, "rb+") as file:
+        data = file.read()
+        if data and not data.endswith(b"\n"):
+            file.truncate(data.rfind(b"\n") + 1)
+
+    done = set()
+    with open(filename, "r", newline="") as file:
+        if filename.endswith(".jsonl"):
+            rows = (json.loads(line) for line in file if line.strip())
+        else:
+            rows = csv.DictReader(file)
+        for row in rows:
+            done.add((int(row["seed"]), int(row["draw_count"])))
+    return done
+
+
+def run(
+    seeds,
+    draw_count,
+    filename,
+    workers=None,
+    max_nodes=200000,
+    max_seconds=10.0,
+):
+    """
+    Analyse deals on a pool of processes, appending each result to the file as soon
+    as it is known (the seeds already in the file are skipped).
+
+    Args:
+        seeds: the seeds of the deals
+        draw_count: cards drawn from the stock at a time (1 or 3)
+        filename: the results file, CSV or JSON lines if the name ends with .jsonl
+        workers: number of processes (None for one per core)
+        max_nodes: node limit of the solver, per deal
+        max_seconds: time limit of the solver, per deal
+
+    Returns:
+        A dictionary of status: number of deals analysed by this run.
+    """
+    done = completed_seeds(filename)
+    tasks = [(seed, draw_count) for seed in seeds if (seed, draw_count) not in done]
+    new_file = not os.path.exists(filename) or os.path.getsize(filename) == 0
+    counts = {}
+
+    with open(filename, "a", newline="") as file:
+        jsonl = filename.endswith(".jsonl")
+        writer = None if jsonl else csv.DictWriter(file, fieldnames=fields)
+        if writer and new_file:
+            writer.writeheader()
+
+        with multiprocessing.Pool(
+            workers, initializer=start_worker, initargs=(max_nodes, max_seconds)
+        ) as pool:
+            # deals take from milliseconds to the time limit: small chunks keep
+            # every process busy until the end
+            for row in pool.imap_unordered(analyse_deal, tasks, chunksize=4):
+                if jsonl:
+                    file.write(json.dumps(row) + "\n")
+                else:
+                    writer.writerow(row)
+                file.flush()
+                counts[row["status"]] = counts.get(row["status"], 0) + 1
+
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Solve a range of seeded deals on every core."
+    )
+    parser.add_argument("start", type=int, help="first seed")
+    parser.add_argument("stop", type=int, help="last seed (not included)")
+    parser.add_argument("--mode", type=int, choices=[1, 3], default=3)
+    parser.add_argument("--output", default="deals.csv", help="CSV or .jsonl file")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--nodes", type=int, default=200000, help="node limit")
+    parser.add_argument("--seconds", type=float, default=10.0, help="time limit")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = run(
+        range(args.start, args.stop),
+        args.mode,
+        args.output,
+        args.workers,
+        args.nodes,
+        args.seconds,
+    )
+    elapsed = time.perf_counter() - start
+    analysed = sum(counts.values())
+    print(
+        f"{analysed} deals in {elapsed:.1f} s ({analysed / elapsed:.1f} deals/s): "
+        + ", ".join(f"{status} {count}" for status, count in sorted(counts.items()))
+    )
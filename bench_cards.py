@@ -0,0 +1,269 @@
+import argparse
+import random
+import sys
+import timeit
+
+import engine
+
+
+# The card model before the integer codes, kept here as the reference of the benchmark:
+# a card object per card, its colour found by comparing symbol strings.
+class ObjectCard:
+    """
+    The class ObjectCard is the card as an object with a number, a symbol string
+    and its side, as the game had it before the integer codes.
+    """
+
+    def __init__(self, number, symbol):
+        """
+        ObjectCard constructor
+
+        Args:
+            self: refer to the current instance
+            number: number of the card (1,2,..,13)
+            symbol: symbol of card (hearts,diamons,clubs,spades)
+
+        Returns:
+            None
+        """
+        self.number = number
+        self.symbol = symbol
+        self.face_up = False
+
+
+# the piles checked by the object functions (module globals, as in the old game)
+object_tableau = [[]]
+object_foundation = [[]]
+
+
+def object_deck():
+    """
+    Generate a deck of ObjectCard.
+
+    Args:
+        None
+
+    Returns:
+        The list of 52 cards.
+    """
+    deck = []
+    for number in range(1, 14):
+        for symbol in engine.card_symbols:
+            deck.append(ObjectCard(number, symbol))
+    return deck
+
+
+def object_opposed_color_symbol(symbol1, symbol2):
+    """
+    Verify if two cards symbols are the different colour (red-black), by comparing
+    the symbol strings.
+
+    Args:
+        symbol1: symbol of first card
+        symbol2: symbol of second card
+
+    Returns:
+        True/False if it is the opposed color or not.
+    """
+    if symbol1 == "clubs" or symbol1 == "spades":
+        if symbol2 == "hearts" or symbol2 == "diamonds":
+            return True
+        else:
+            return False
+
+    elif symbol1 == "hearts" or symbol1 == "diamonds":
+        if symbol2 == "clubs" or symbol2 == "spades":
+            return True
+        else:
+            return False
+
+
+def object_place_card_tableau(placed_card, nr_tableau):
+    """
+    Verifies if a card object can be placed in tableau.
+
+    Args:
+        placed_card: the card that will be placed
+        nr_tableau: which tableau pile
+
+    Returns:
+        True/False if the card can be placed
+    """
+    if object_tableau[nr_tableau]:
+        if (
+            placed_card.number + 1 == object_tableau[nr_tableau][-1].number
+            and object_opposed_color_symbol(
+                placed_card.symbol, object_tableau[nr_tableau][-1].symbol
+            )
+            == True
+        ):
+            return True
+
+    elif placed_card.number == 13:
+        return True
+
+    return False
+
+
+def object_place_card_foundation(placed_card, nr_foundation):
+    """
+    Verifies if a card object can be placed in foundation.
+
+    Args:
+        placed_card: the card that will be placed
+        nr_foundation: which foundation pile
+
+    Returns:
+        True/False if the card can be placed
+    """
+    if object_foundation[nr_foundation]:
+        if (
+            placed_card.number - 1 == object_foundation[nr_foundation][-1].number
+            and placed_card.symbol == object_foundation[nr_foundation][-1].symbol
+        ):
+            return True
+
+    elif placed_card.number == 1:
+        return True
+
+    return False
+
+
+def check_pairs(count, seed, step=None):
+    """
+    Pick random (card, top of pile) pairs, the same for both card models.
+
+    Args:
+        count: number of pairs
+        seed: seed of the random pairs
+        step: None for any two cards, -1 for a card one below the top (the tableau
+              checks compare the colours), 1 for one above (foundation)
+
+    Returns:
+        The list of (card code, top card code) pairs.
+    """
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < count:
+        card, top = rng.randrange(52), rng.randrange(52)
+        if step is None or engine.card_number[card] == engine.card_number[top] + step:
+            pairs.append((card, top))
+    return pairs
+
+
+def run(count=100000, repeats=5, seed=0):
+    """
+    Time the placement checks and the deck generation with card objects and with
+    card codes.
+
+    Args:
+        count: number of checks per timed run
+        repeats: number of timed runs (the fastest is reported)
+        seed: seed of the checked pairs
+
+    Returns:
+        A list of (benchmark, objects ns, codes ns) per operation.
+    """
+    objects = object_deck()
+    state = engine.GameState()
+
+    def time_per_call(function, calls):
+        return 1e9 * min(timeit.repeat(function, number=1, repeat=repeats)) / calls
+
+    def time_checks(pairs, object_piles, object_check, code_piles, code_check):
+        # both models put the pile in place before the check, as a game does
+        object_pairs = [([objects[top]], objects[card]) for card, top in pairs]
+        code_pairs = [([top], card) for card, top in pairs]
+
+        def objects_checks():
+            for pile, card in object_pairs:
+                object_piles[0] = pile
+                object_check(card, 0)
+
+        def codes_checks():
+            for pile, card in code_pairs:
+                code_piles[0] = pile
+                code_check(card, 0)
+
+        return time_per_call(objects_checks, count), time_per_call(codes_checks, count)
+
+    results = []
+    for name, step in [("any cards", None), ("next rank", -1)]:
+        results.append(
+            (f"place_card_tableau, {name}",)
+            + time_checks(
+                check_pairs(count, seed, step),
+                object_tableau,
+                object_place_card_tableau,
+                state.tableau,
+                state.place_card_tableau,
+            )
+        )
+    for name, step in [("any cards", None), ("next rank", 1)]:
+        results.append(
+            (f"place_card_foundation, {name}",)
+            + time_checks(
+                check_pairs(count, seed, step),
+                object_foundation,
+                object_place_card_foundation,
+                state.foundation,
+                state.place_card_foundation,
+            )
+        )
+
+    # the colour test alone: string comparisons against one table lookup per card
+    pairs = check_pairs(count, seed)
+    symbol_pairs = [(objects[card].symbol, objects[top].symbol) for card, top in pairs]
+    card_red = engine.card_red
+
+    def objects_colours():
+        for symbol1, symbol2 in symbol_pairs:
+            object_opposed_color_symbol(symbol1, symbol2)
+
+    def codes_colours():
+        for card, top in pairs:
+            card_red[card] != card_red[top]
+
+    results.append(
+        (
+            "opposed colour",
+            time_per_call(objects_colours, count),
+            time_per_call(codes_colours, count),
+        )
+    )
+
+    decks = 1000
+    results.append(
+        (
+            "generate_card_deck",
+            time_per_call(lambda: [object_deck() for _ in range(decks)], decks),
+            time_per_call(
+                lambda: [engine.generate_card_deck() for _ in range(decks)], decks
+            ),
+        )
+    )
+    results.append(
+        (
+            "bytes per card",
+            sys.getsizeof(objects[0]) + sys.getsizeof(objects[0].__dict__),
+            sys.getsizeof(51),
+        )
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the card objects with the card codes."
+    )
+    parser.add_argument("--count", type=int, default=100000, help="checks per run")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'':34} {'objects':>10} {'codes':>10} {'speedup':>8}")
+    for name, objects_time, codes_time in run(args.count, args.repeats):
+        unit = "" if name == "bytes per card" else " ns"
+        print(
+            f"{name:34} {objects_time:7.1f}{unit:3} {codes_time:7.1f}{unit:3} "
+            f"{objects_time / codes_time:7.2f}x"
+        )
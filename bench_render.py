@@ -0,0 +1,428 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+# no window: the SDL dummy video driver (set before pygame starts)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import engine
+import solitaire
+from headless import make_event
+
+# boards of the benchmark: seeded deals and the tallest columns the renderer can get
+deal_seeds = [1, 2, 3]
+drag_steps = 8  # frames between two points of a drag trajectory
+
+
+class CountingSurface(pygame.Surface):
+    """
+    The class CountingSurface is a screen-sized surface that counts the blits made
+    on it. It replaces the screen while the blits of a scenario are counted, so the
+    timed runs use the real screen without the counting overhead.
+    """
+
+    blits_made = 0
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """
+        Count the blit and draw it.
+
+        Args:
+            self: refer to the current instance
+            source: the surface drawn
+            dest: where it is drawn
+            area: the part of source that is drawn
+            special_flags: pygame blend flags
+
+        Returns:
+            The rectangle that was drawn.
+        """
+        CountingSurface.blits_made += 1
+        return super().blit(source, dest, area, special_flags)
+
+
+def deal_board(seed):
+    """
+    Build the board of a seeded deal, exactly as the game deals it.
+
+    Args:
+        seed: seed of the deal
+
+    Returns:
+        The GameState of the deal.
+    """
+    return engine.seeded_game(seed, 3)
+
+
+def tall_board():
+    """
+    Build the worst case board for the renderer: every tableau column has 19 cards
+    (6 face down and a face up run from king to ace), three cards are shown and every
+    foundation has cards. The cards repeat between columns, so it is not a legal game,
+    only the most the board can ever draw.
+
+    Args:
+        None
+
+    Returns:
+        The GameState of the board.
+    """
+    symbols = engine.card_symbols
+    black, red = ["clubs", "spades"], ["diamonds", "hearts"]
+    state = engine.GameState(3)
+    for nr_tableau in range(7):
+        column = [
+            engine.card_code(13, symbols[(nr_tableau + index) % 4])
+            for index in range(6)
+        ]
+        for number in range(13, 0, -1):
+            # alternate red and black down the run
+            colour = red if (number + nr_tableau) % 2 else black
+            column.append(engine.card_code(number, colour[nr_tableau % 2]))
+        state.tableau[nr_tableau] = column
+        state.hidden[nr_tableau] = 6
+
+    state.set_stock(
+        [engine.card_code(number, "clubs") for number in range(1, 14)],
+        [engine.card_code(number, "hearts") for number in (4, 5, 6)],
+        3,
+    )
+    for nr_foundation, symbol in enumerate(symbols):
+        state.foundation[nr_foundation] = [
+            engine.card_code(number, symbol) for number in range(1, 4)
+        ]
+
+    return state
+
+
+def boards():
+    """
+    Get the boards of the benchmark.
+
+    Args:
+        None
+
+    Returns:
+        A dictionary of board name: function that builds the board.
+    """
+    builders = {}
+    for seed in deal_seeds:
+        builders[f"seed-{seed}"] = lambda seed=seed: deal_board(seed)
+    builders["tall"] = tall_board
+    return builders
+
+
+def set_board(state):
+    """
+    Put a board in the game and draw it (not timed).
+
+    Args:
+        state: the GameState of the board
+
+    Returns:
+        None
+    """
+    solitaire.set_state(state)
+    solitaire.moving = False
+    solitaire.drawn_card = None
+    solitaire.dirty_rect = None
+    solitaire.draw_cards(solitaire.screen)
+    solitaire.compositor.flush()
+
+
+def drag_start(nr_tableau):
+    """
+    Get the point where a drag of a tableau column starts: the first face up card,
+    so the longest run of the column is dragged.
+
+    Args:
+        nr_tableau: tableau index
+
+    Returns:
+        The (x, y) of the point.
+    """
+    index = solitaire.state.hidden[nr_tableau]
+    rect = solitaire.tableau_column_rect(nr_tableau)
+    return (
+        rect.x + solitaire.card_width // 2,
+        rect.y + solitaire.space_tableau * index + 5,
+    )
+
+
+def drag_trajectory(nr_tableau):
+    """
+    Get the frames of a drag: pick the run of a column, carry it over every other
+    column (to the bottom of its cards) and drop it back where it was.
+
+    Args:
+        nr_tableau: tableau index of the dragged run
+
+    Returns:
+        The list of frames, each a list of pygame events.
+    """
+    start = drag_start(nr_tableau)
+    points = [start]
+    for target in range(7):
+        if target != nr_tableau:
+            rect = solitaire.tableau_column_rect(target)
+            points.append((rect.centerx, rect.bottom - solitaire.card_height // 2))
+    points.append(start)
+
+    frames = [[make_event({"type": "MOUSEBUTTONDOWN", "pos": start, "button": 1})]]
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        for step in range(1, drag_steps + 1):
+            position = (
+                round(x1 + (x2 - x1) * step / drag_steps),
+                round(y1 + (y2 - y1) * step / drag_steps),
+            )
+            frames.append(
+                [
+                    make_event(
+                        {
+                            "type": "MOUSEMOTION",
+                            "pos": position,
+                            "rel": (0, 0),
+                            "buttons": (1, 0, 0),
+                        }
+                    )
+                ]
+            )
+    frames.append([make_event({"type": "MOUSEBUTTONUP", "pos": start, "button": 1})])
+    return frames
+
+
+def scenario_frames(kind):
+    """
+    Get the frames of a scenario on the board in the game. A frame is either a list
+    of events handled by the game followed by draw_frame, or a function that draws.
+
+    Args:
+        kind: "draw_cards", "draw_tableau", "draw_tableau_specific" or "drag"
+
+    Returns:
+        The list of frames.
+    """
+    screen = lambda: solitaire.screen
+    if kind == "draw_cards":
+        return [lambda: solitaire.draw_cards(screen())] * 20
+
+    if kind == "draw_tableau":
+        return [
+            lambda nr_tableau=nr_tableau: solitaire.draw_tableau(screen(), nr_tableau)
+            for nr_tableau in range(7)
+        ] * 3
+
+    if kind == "draw_tableau_specific":
+        # the cards under a card sized rectangle over the bottom of every column
+        frames = []
+        for nr_tableau in range(7):
+            rect = solitaire.tableau_column_rect(nr_tableau)
+            dirty = pygame.Rect(
+                rect.x,
+                rect.bottom - solitaire.card_height,
+                rect.width,
+                solitaire.card_height,
+            )
+            start, final = solitaire.dirty_card_indexes(dirty, nr_tableau)
+            frames.append(
+                lambda nr_tableau=nr_tableau, start=start, final=final: (
+                    solitaire.draw_tableau_specific(screen(), nr_tableau, start, final)
+                )
+            )
+        return frames * 3
+
+    frames = []
+    for nr_tableau in range(7):
+        frames += drag_trajectory(nr_tableau)
+    return frames
+
+
+def play(frames):
+    """
+    Draw the frames of a scenario, sending each one to the display.
+
+    Args:
+        frames: the frames of the scenario
+
+    Returns:
+        The list of frame times in seconds.
+    """
+    times = []
+    for frame in frames:
+        start = time.perf_counter()
+        if callable(frame):
+            frame()
+        else:
+            for event in frame:
+                solitaire.handle_event(event)
+            solitaire.draw_frame()
+        pygame.display.update(solitaire.compositor.flush())
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def count_blits(build, kind):
+    """
+    Count the blits made on the screen by a scenario.
+
+    Args:
+        build: function that builds the board
+        kind: the scenario
+
+    Returns:
+        The number of blits.
+    """
+    screen = solitaire.screen
+    counting = CountingSurface(screen.get_size(), 0, screen)
+    solitaire.screen = counting
+    solitaire.compositor.screen = counting
+    try:
+        set_board(build())
+        frames = scenario_frames(kind)
+        CountingSurface.blits_made = 0
+        play(frames)
+        return CountingSurface.blits_made
+    finally:
+        solitaire.screen = screen
+        solitaire.compositor.screen = screen
+
+
+def git_commit():
+    """
+    Get the commit of the working tree, to tell the result files apart.
+
+    Args:
+        None
+
+    Returns:
+        The short commit hash, None outside of a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(size=(1000, 750), repeats=5, kinds=None):
+    """
+    Run every scenario on every board. Each scenario is timed repeats times on a
+    freshly built board and its blits are counted once, on a separate run.
+
+    Args:
+        size: (width, height) of the (invisible) window
+        repeats: how many timed runs per scenario (the median is reported)
+        kinds: scenarios to run (None for all)
+
+    Returns:
+        A dictionary with the settings and the results of every scenario.
+    """
+    solitaire.start_game(size, 0)
+    kinds = kinds or ["draw_cards", "draw_tableau", "draw_tableau_specific", "drag"]
+
+    results = []
+    for board, build in boards().items():
+        for kind in kinds:
+            runs = []
+            for _ in range(repeats):
+                set_board(build())
+                times = play(scenario_frames(kind))
+                runs.append(1000 * sum(times) / len(times))
+            frames = len(times)
+            blits = count_blits(build, kind)
+            results.append(
+                {
+                    "scenario": f"{board}/{kind}",
+                    "frames": frames,
+                    "ms_per_frame": round(statistics.median(runs), 4),
+                    "min_ms_per_frame": round(min(runs), 4),
+                    "blits_per_frame": round(blits / frames, 2),
+                }
+            )
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "size": list(size),
+        "repeats": repeats,
+        "results": results,
+        "card_images": solitaire.card_images.stats(),
+        "card_sizes": solitaire.card_asset_sets.stats(),
+    }
+
+
+def compare(results, baseline):
+    """
+    Compare the results with those of another run (e.g. the previous commit).
+
+    Args:
+        results: the dictionary returned by run()
+        baseline: a dictionary returned by run(), loaded from its JSON file
+
+    Returns:
+        One line per scenario with both times and their ratio.
+    """
+    previous = {result["scenario"]: result for result in baseline["results"]}
+    lines = [f"{'scenario':32} {'before':>9} {'after':>9} {'ratio':>6} {'blits':>13}"]
+    for result in results["results"]:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        ratio = (
+            result["ms_per_frame"] / before["ms_per_frame"]
+            if before["ms_per_frame"]
+            else 0
+        )
+        lines.append(
+            f"{result['scenario']:32} {before['ms_per_frame']:9.4f} "
+            f"{result['ms_per_frame']:9.4f} {ratio:6.2f} "
+            f"{before['blits_per_frame']:6} {result['blits_per_frame']:6}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the board rendering.")
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=750)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=["draw_cards", "draw_tableau", "draw_tableau_specific", "drag"],
+        help="run only this scenario (repeatable)",
+    )
+    parser.add_argument("--output", help="JSON file for the results")
+    parser.add_argument("--compare", help="JSON results of another run")
+    args = parser.parse_args()
+
+    results = run((args.width, args.height), args.repeats, args.scenario)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=1)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            print(compare(results, json.load(file)))
+    else:
+        print(f"{'scenario':32} {'frames':>6} {'ms/frame':>9} {'blits/frame':>11}")
+        for result in results["results"]:
+            print(
+                f"{result['scenario']:32} {result['frames']:6} "
+                f"{result['ms_per_frame']:9.4f} {result['blits_per_frame']:11}"
+            )
+    print(solitaire.card_images.report())
+    print(solitaire.card_asset_sets.report())
@@ -0,0 +1,535 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+import pygame
+
+# Card images (the 52 faces and the card back):
+card_numbers = range(1, 14)
+card_symbols = ["clubs", "diamonds", "hearts", "spades"]
+card_back_key = "back"
+# keys of the faces, in the order of the card codes (see engine.py)
+card_keys = [(number, symbol) for number in card_numbers for symbol in card_symbols]
+
+# default locations, relative to the game folder
+base_directory = os.path.dirname(os.path.abspath(__file__))
+cards_directory = os.path.join(base_directory, "cards", "clasic")
+bundle_path = os.path.join(base_directory, "cards", "clasic.bundle")
+
+# Bundle format: header, then the raw RGB pixels of every image in bundle_keys() order
+bundle_magic = b"SOLCARDS"
+bundle_version = 1
+# magic, version, width, height, count, fingerprint
+bundle_header = struct.Struct("<8sHHHH16s")
+bundle_pixel_format = "RGB"
+bundle_bytes_per_pixel = 3
+
+
+def bundle_keys():
+    """
+    Get the cache keys of all the images, in the order they are stored in a bundle.
+
+    Args:
+        None
+
+    Returns:
+        The list of keys (52 faces as (number, symbol) and card_back_key)
+    """
+    return card_keys + [card_back_key]
+
+
+def image_path(directory, key):
+    """
+    Get the path of the image file for a cache key.
+
+    Args:
+        directory: folder with the card images
+        key: (number, symbol) of a card or card_back_key
+
+    Returns:
+        The path of the image file.
+    """
+    if key == card_back_key:
+        return os.path.join(directory, "card_back.png")
+    return os.path.join(directory, f"{key[0]}_of_{key[1]}.png")
+
+
+def source_fingerprint(directory):
+    """
+    Fingerprint the card images (names, sizes and modification times), without
+    decoding them.
+
+    Args:
+        directory: folder with the card images
+
+    Returns:
+        16 bytes that change whenever one of the images changes.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for key in bundle_keys():
+        path = image_path(directory, key)
+        info = os.stat(path)
+        digest.update(
+            f"{os.path.basename(path)}:{info.st_size}:{info.st_mtime_ns};".encode()
+        )
+    return digest.digest()
+
+
+def build_bundle(directory=cards_directory, path=bundle_path, size=(100, 150)):
+    """
+    Pack all the card images, already scaled, into one raw pixel bundle file.
+
+    Args:
+        directory: folder with the card images
+        path: the bundle file that will be written
+        size: (width, height) of the cards in the bundle
+
+    Returns:
+        The number of bytes written.
+    """
+    keys = bundle_keys()
+    header = bundle_header.pack(
+        bundle_magic,
+        bundle_version,
+        size[0],
+        size[1],
+        len(keys),
+        source_fingerprint(directory),
+    )
+
+    # write next to the bundle and rename, so a half written file is never loaded
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(header)
+        for key in keys:
+            image = pygame.transform.scale(
+                pygame.image.load(image_path(directory, key)), size
+            )
+            file.write(pygame.image.tobytes(image, bundle_pixel_format))
+    os.replace(temporary_path, path)
+
+    return os.path.getsize(path)
+
+
+def open_bundle(directory=cards_directory, path=bundle_path, size=(100, 150)):
+    """
+    Memory-map a bundle file if it is up to date with the card images and the card size.
+
+    Args:
+        directory: folder with the card images
+        path: the bundle file
+        size: (width, height) the cards need to have
+
+    Returns:
+        The mapped bundle, or None if it is missing or stale.
+    """
+    try:
+        with open(path, "rb") as file:
+            bundle = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    image_bytes = size[0] * size[1] * bundle_bytes_per_pixel
+    keys = bundle_keys()
+    if len(bundle) != bundle_header.size + image_bytes * len(keys):
+        bundle.close()
+        return None
+
+    magic, version, width, height, count, fingerprint = bundle_header.unpack_from(
+        bundle
+    )
+    try:
+        fresh = fingerprint == source_fingerprint(directory)
+    except OSError:
+        # without the PNG folder the bundle is the only source of images
+        fresh = True
+    if (
+        magic != bundle_magic
+        or version != bundle_version
+        or (width, height) != tuple(size)
+        or count != len(keys)
+        or not fresh
+    ):
+        bundle.close()
+        return None
+
+    return bundle
+
+
+class CardImageCache:
+    """
+    The class CardImageCache keeps the card images decoded and scaled,
+    so that every card is loaded from disk only once per process.
+    It counts the hits and misses and reports its memory footprint.
+    """
+
+    def __init__(self, size, directory=cards_directory, bundle=bundle_path):
+        """
+        CardImageCache constructor
+
+        Args:
+            self: refer to the current instance
+            size: (width, height) to which the card images are scaled
+            directory: folder with the card images (number_of_symbol.png, card_back.png)
+            bundle: packed bundle file tried before the folder (None to always decode)
+
+        Returns:
+            None
+        """
+        self.size = size
+        self.directory = directory
+        self.bundle = bundle
+        self.source = None  # "bundle", "png" or "scaled" once loaded
+        self.mapped_bundle = None
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load_image(self, key):
+        """
+        Decode and scale the image for a cache key (a cache miss).
+
+        Args:
+            self: refer to the current instance
+            key: (number, symbol) of a card or card_back_key
+
+        Returns:
+            The scaled surface.
+        """
+        self.misses += 1
+        image = pygame.image.load(image_path(self.directory, key))
+        if pygame.display.get_surface():
+            image = image.convert()
+        surface = pygame.transform.smoothscale(image, self.size)
+        self.surfaces[key] = surface
+        return surface
+
+    def get(self, key):
+        """
+        Get the scaled surface for a cache key, loading it on the first use.
+
+        Args:
+            self: refer to the current instance
+            key: (number, symbol) of a card or card_back_key
+
+        Returns:
+            The scaled surface.
+        """
+        surface = self.surfaces.get(key)
+        if surface is None:
+            return self.load_image(key)
+        self.hits += 1
+        return surface
+
+    def face(self, number, symbol):
+        """
+        Get the face of a card.
+
+        Args:
+            self: refer to the current instance
+            number: number of the card (1,2,..,13)
+            symbol: symbol of card (hearts,diamons,clubs,spades)
+
+        Returns:
+            The scaled surface of the card face.
+        """
+        return self.get((number, symbol))
+
+    def card(self, code):
+        """
+        Get the face of a card from its code.
+
+        Args:
+            self: refer to the current instance
+            code: code of the card (0..51)
+
+        Returns:
+            The scaled surface of the card face.
+        """
+        return self.get(card_keys[code])
+
+    def back(self):
+        """
+        Get the back of the cards.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The scaled surface of the card back.
+        """
+        return self.get(card_back_key)
+
+    def load_bundle(self):
+        """
+        Create all the surfaces from the memory-mapped bundle, without decoding any PNG.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            True/False if the bundle could be used
+        """
+        if self.bundle is None:
+            return False
+        bundle = open_bundle(self.directory, self.bundle, self.size)
+        if bundle is None:
+            return False
+
+        image_bytes = self.size[0] * self.size[1] * bundle_bytes_per_pixel
+        pixels = memoryview(bundle)
+        converted = pygame.display.get_surface() is not None
+        offset = bundle_header.size
+        for key in bundle_keys():
+            self.misses += 1
+            surface = pygame.image.frombuffer(
+                pixels[offset : offset + image_bytes], self.size, bundle_pixel_format
+            )
+            if converted:
+                # a copy in the display format, so the bundle pages can be released
+                surface = surface.convert()
+            self.surfaces[key] = surface
+            offset += image_bytes
+
+        if converted:
+            pixels.release()
+            bundle.close()
+        else:
+            # the surfaces point directly into the mapped file
+            self.mapped_bundle = bundle
+        return True
+
+    def preload(self):
+        """
+        Load all 53 images (52 faces and the back) at once, from the bundle when
+        it is up to date, otherwise by decoding and scaling the PNG files.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        if self.load_bundle():
+            self.source = "bundle"
+            return
+
+        self.source = "png"
+        for key in bundle_keys():
+            if key not in self.surfaces:
+                self.load_image(key)
+
+    def scale_from(self, images):
+        """
+        Create all the surfaces by scaling those of another set, already loaded,
+        without reading any file.
+
+        Args:
+            self: refer to the current instance
+            images: the CardImageCache scaled from
+
+        Returns:
+            None
+        """
+        self.source = "scaled"
+        for key in bundle_keys():
+            self.misses += 1
+            self.surfaces[key] = pygame.transform.smoothscale(
+                images.surfaces[key], self.size
+            )
+
+    def clear(self):
+        """
+        Forget all the loaded surfaces (e.g. when the display changes).
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        self.surfaces = {}
+        self.mapped_bundle = None
+
+    def memory_bytes(self):
+        """
+        Get the memory used by the pixels of the cached surfaces.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The number of bytes.
+        """
+        return sum(
+            surface.get_pitch() * surface.get_height()
+            for surface in self.surfaces.values()
+        )
+
+    def stats(self):
+        """
+        Get the statistics of the cache.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            A dictionary with the hits, misses, number of images, memory used and
+            where the images were loaded from.
+        """
+        return {
+            "source": self.source,
+            "hits": self.hits,
+            "misses": self.misses,
+            "images": len(self.surfaces),
+            "bytes": self.memory_bytes(),
+        }
+
+    def report(self):
+        """
+        Get the statistics of the cache as text.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            One line.
+        """
+        stats = self.stats()
+        return (
+            f"card images {self.size[0]}x{self.size[1]} ({stats['source']}): "
+            f"{stats['hits']} hits, {stats['misses']} misses, {stats['images']} "
+            f"images, {stats['bytes'] / 2**20:.1f} MiB"
+        )
+
+
+class CardAssetSets:
+    """
+    The class CardAssetSets keeps a few CardImageCache sets, one per card size,
+    so that going back to a recent window size does not scale the images again.
+    The images are decoded once at the size of the bundle and the smaller sizes
+    are scaled from those; a larger size is scaled down from the PNG files, decoded
+    again for it (keeping the full size images would take about 95 MB). The least
+    recently used set is dropped when there are too many (the base size is always
+    kept).
+    """
+
+    def __init__(
+        self,
+        max_sets=3,
+        directory=cards_directory,
+        bundle=bundle_path,
+        base_size=(100, 150),
+    ):
+        """
+        CardAssetSets constructor
+
+        Args:
+            self: refer to the current instance
+            max_sets: how many card sizes are kept, besides the base size
+            directory: folder with the card images
+            bundle: packed bundle file tried before the folder
+            base_size: (width, height) of the cards in the bundle
+
+        Returns:
+            None
+        """
+        self.max_sets = max_sets
+        self.directory = directory
+        self.bundle = bundle
+        self.base_size = tuple(base_size)
+        self.base = None
+        self.sets = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, size):
+        """
+        Get the card images for a card size, scaling them only for a new size.
+
+        Args:
+            self: refer to the current instance
+            size: (width, height) of the cards
+
+        Returns:
+            The CardImageCache with all the images of that size.
+        """
+        size = tuple(size)
+        if size == self.base_size and self.base is not None:
+            self.hits += 1
+            return self.base
+        images = self.sets.get(size)
+        if images is not None:
+            self.hits += 1
+            self.sets.move_to_end(size)
+            return images
+
+        self.misses += 1
+        larger = size[0] > self.base_size[0] or size[1] > self.base_size[1]
+        if larger and os.path.isdir(self.directory):
+            # scaled up from the base set the cards would be blurred
+            images = CardImageCache(size, self.directory, None)
+            images.preload()
+        else:
+            if self.base is None:
+                self.base = CardImageCache(self.base_size, self.directory, self.bundle)
+                self.base.preload()
+            if size == self.base_size:
+                return self.base
+            images = CardImageCache(size, self.directory, self.bundle)
+            images.scale_from(self.base)
+        self.sets[size] = images
+        if len(self.sets) > self.max_sets:
+            self.sets.popitem(last=False)
+        return images
+
+    def stats(self):
+        """
+        Get the statistics of the sets.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            A dictionary with the hits, misses, sizes kept and memory used.
+        """
+        sets = ([self.base] if self.base else []) + list(self.sets.values())
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sizes": [images.size for images in sets],
+            "bytes": sum(images.memory_bytes() for images in sets),
+        }
+
+    def report(self):
+        """
+        Get the statistics of the sets as text.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            One line.
+        """
+        stats = self.stats()
+        sizes = ", ".join(f"{width}x{height}" for width, height in stats["sizes"])
+        return (
+            f"card sizes: {stats['hits']} hits, {stats['misses']} misses, kept "
+            f"{sizes}, {stats['bytes'] / 2**20:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    # build step: python card_assets.py [--width 100 --height 150]
+    parser = argparse.ArgumentParser(description="Pack the card images into a bundle.")
+    parser.add_argument("--directory", default=cards_directory)
+    parser.add_argument("--output", default=bundle_path)
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("--height", type=int, default=150)
+    args = parser.parse_args()
+
+    written = build_bundle(args.directory, args.output, (args.width, args.height))
+    print(f"Wrote {args.output} ({written} bytes)")
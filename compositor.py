@@ -0,0 +1,144 @@
+import pygame
+
+
+def merge_rects(rects):
+    """
+    Merge the rectangles that overlap or touch, until no two of them do.
+
+    Args:
+        rects: list of pygame rectangles
+
+    Returns:
+        The list of merged rectangles.
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        # absorb the merged rectangles it touches, checking again after each union
+        index = 0
+        while index < len(merged):
+            if rect.inflate(2, 2).colliderect(merged[index]):
+                rect.union_ip(merged.pop(index))
+                index = 0
+            else:
+                index += 1
+        merged.append(rect)
+
+    return merged
+
+
+class Compositor:
+    """
+    The class Compositor collects the regions of the screen changed during a frame
+    (pile changes, the moving card, the HUD), so that only those are sent to the
+    display. It also keeps pixel area statistics for the frames.
+    """
+
+    def __init__(self, screen):
+        """
+        Compositor constructor
+
+        Args:
+            self: refer to the current instance
+            screen: the pygame screen
+
+        Returns:
+            None
+        """
+        self.screen = screen
+        self.dirty = []
+        self.frames = 0
+        self.total_area = 0
+        self.total_screen_area = 0
+        self.last_area = 0
+        self.last_rects = 0
+
+    def mark(self, rect):
+        """
+        Mark a region of the screen as changed. Only the part inside the current
+        clipping area of the screen is kept (that is the only part that can change).
+
+        Args:
+            self: refer to the current instance
+            rect: the changed rectangle
+
+        Returns:
+            None
+        """
+        rect = pygame.Rect(rect).clip(self.screen.get_clip())
+        if rect.width > 0 and rect.height > 0:
+            self.dirty.append(rect)
+
+    def mark_all(self):
+        """
+        Mark the whole screen as changed.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        self.dirty = [self.screen.get_rect()]
+
+    def flush(self):
+        """
+        End the frame: merge the changed regions and update the statistics.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The list of rectangles for pygame.display.update.
+        """
+        rects = merge_rects(self.dirty)
+        self.dirty = []
+
+        screen_rect = self.screen.get_rect()
+        self.last_rects = len(rects)
+        self.last_area = sum(rect.width * rect.height for rect in rects)
+        self.frames += 1
+        self.total_area += self.last_area
+        self.total_screen_area += screen_rect.width * screen_rect.height
+
+        return rects
+
+    def stats(self):
+        """
+        Get the pixel area statistics of the frames.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            A dictionary with the area and rectangles of the last frame, the average
+            area per frame and the fraction of the screen that was updated.
+        """
+        return {
+            "frames": self.frames,
+            "last_area": self.last_area,
+            "last_rects": self.last_rects,
+            "average_area": self.total_area / self.frames if self.frames else 0,
+            "updated_fraction": (
+                self.total_area / self.total_screen_area
+                if self.total_screen_area
+                else 0
+            ),
+        }
+
+    def report(self):
+        """
+        Get the pixel area statistics as text.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            One line.
+        """
+        stats = self.stats()
+        return (
+            f"screen updates: {stats['frames']} frames, "
+            f"{stats['average_area']:.0f} pixels per frame, "
+            f"{stats['updated_fraction']:.1%} of the screen"
+        )
@@ -0,0 +1,196 @@
+import argparse
+import csv
+import json
+import mmap
+import os
+import random
+import struct
+
+# default location, relative to the game folder: one index per draw mode
+base_directory = os.path.dirname(os.path.abspath(__file__))
+deals_directory = os.path.join(base_directory, "deals")
+
+# Index format: header, then the seeds as unsigned 32 bit integers, in the order
+# they were added (new seeds are appended at the end)
+index_magic = b"SOLDEALS"
+index_version = 1
+# magic, version, draw count
+index_header = struct.Struct("<8sHH")
+index_seed = struct.Struct("<I")
+max_seed = 2**32 - 1
+
+
+def index_path(draw_count, directory=deals_directory):
+    """
+    Get the path of the index of the winnable deals of a draw mode.
+
+    Args:
+        draw_count: cards drawn from the stock at a time (1 or 3)
+        directory: folder of the indexes
+
+    Returns:
+        The path of the index file.
+    """
+    return os.path.join(directory, f"winnable-draw{draw_count}.idx")
+
+
+def append_seeds(path, draw_count, seeds):
+    """
+    Add seeds at the end of an index, creating it if it does not exist. A seed cut
+    by an interrupted append is removed first.
+
+    Args:
+        path: the index file
+        draw_count: cards drawn from the stock at a time (1 or 3)
+        seeds: the seeds to add (0..max_seed)
+
+    Returns:
+        The number of seeds in the index.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) < index_header.size:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(index_header.pack(index_magic, index_version, draw_count))
+
+    with open(path, "rb+") as file:
+        magic, version, count_draw = index_header.unpack(file.read(index_header.size))
+        if (magic, version, count_draw) != (index_magic, index_version, draw_count):
+            raise ValueError(f"{path} is not an index of draw {draw_count} deals")
+
+        size = file.seek(0, os.SEEK_END)
+        count = (size - index_header.size) // index_seed.size
+        file.truncate(index_header.size + count * index_seed.size)
+        file.seek(0, os.SEEK_END)
+        for seed in seeds:
+            file.write(index_seed.pack(seed))
+            count += 1
+
+    return count
+
+
+class DealIndex:
+    """
+    The class DealIndex reads an index of winnable deals through a memory map: the
+    file is not loaded, a deal is picked by reading the 4 bytes of one seed.
+    """
+
+    def __init__(self, path, draw_count):
+        """
+        DealIndex constructor (an empty index if the file is missing or not valid)
+
+        Args:
+            self: refer to the current instance
+            path: the index file
+            draw_count: the draw mode the deals have to be winnable in
+
+        Returns:
+            None
+        """
+        self.path = path
+        self.draw_count = draw_count
+        self.data = None
+        self.count = 0
+
+        try:
+            with open(path, "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+
+        if len(data) < index_header.size or index_header.unpack_from(data) != (
+            index_magic,
+            index_version,
+            draw_count,
+        ):
+            data.close()
+            return
+
+        self.data = data
+        self.count = (len(data) - index_header.size) // index_seed.size
+
+    def seed(self, number):
+        """
+        Get a seed of the index.
+
+        Args:
+            self: refer to the current instance
+            number: position of the seed in the index (0..count-1)
+
+        Returns:
+            The seed.
+        """
+        return index_seed.unpack_from(
+            self.data, index_header.size + number * index_seed.size
+        )[0]
+
+    def pick(self, rng=random):
+        """
+        Pick a winnable deal at random.
+
+        Args:
+            self: refer to the current instance
+            rng: the random generator
+
+        Returns:
+            The seed of the deal, None if the index is empty.
+        """
+        if not self.count:
+            return None
+        return self.seed(rng.randrange(self.count))
+
+    def close(self):
+        """
+        Unmap the index file.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+            self.count = 0
+
+
+def winnable_seeds(filename):
+    """
+    Read the winnable seeds from the results of analyse_deals.py.
+
+    Args:
+        filename: the CSV (or .jsonl) results file
+
+    Returns:
+        A dictionary of draw count: list of seeds found winnable.
+    """
+    seeds = {}
+    with open(filename, "r", newline="") as file:
+        if filename.endswith(".jsonl"):
+            rows = (json.loads(line) for line in file if line.strip())
+        else:
+            rows = csv.DictReader(file)
+        for row in rows:
+            if row["status"] == "win":
+                seeds.setdefault(int(row["draw_count"]), []).append(int(row["seed"]))
+    return seeds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Add the winnable deals found by analyse_deals.py to the indexes."
+    )
+    parser.add_argument("results", nargs="+", help="CSV or .jsonl results files")
+    parser.add_argument("--directory", default=deals_directory)
+    args = parser.parse_args()
+
+    for filename in args.results:
+        for draw_count, seeds in sorted(winnable_seeds(filename).items()):
+            path = index_path(draw_count, args.directory)
+            index = DealIndex(path, draw_count)
+            known = {index.seed(number) for number in range(index.count)}
+            index.close()
+
+            new_seeds = sorted(set(seeds) - known)
+            count = append_seeds(path, draw_count, new_seeds)
+            print(f"{path}: {len(new_seeds)} seeds added, {count} in total")
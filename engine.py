@@ -0,0 +1,742 @@
+import random
+
+# Cards are the integers 0..51, in the order of a new deck:
+# code = (number - 1) * 4 + index of the symbol in card_symbols
+# Which side is up is not part of the card: it follows from the pile (see GameState).
+card_symbols = ["clubs", "diamonds", "hearts", "spades"]
+red_symbols = ("hearts", "diamonds")
+
+# Moves: (source, source_nr, count, destination, destination_nr), the piles being
+# "stock", "show", "foundation" and "tableau"; e.g. ("tableau", 2, 3, "tableau", 5)
+# moves the last 3 cards of tableau 2 on tableau 5
+draw_move = ("stock", 0, 0, "show", 0)  # click on the stock pile
+
+
+def generate_card_deck():
+    """
+    Generate a new deck of cards.
+
+    Args:
+        None
+
+    Returns:
+        The newly generated deck of cards (the codes 0..51 in order)
+    """
+    return list(range(52))
+
+
+def shuffle_deck(deck, rng=random):
+    """
+    Shuffle the deck.
+
+    Args:
+        deck: the deck of cards
+        rng: the random generator (the random module or a random.Random)
+
+    Returns:
+        None
+    """
+    rng.shuffle(deck)
+
+
+def split_deck_in_components(deck):
+    """
+    Splits the deck of cards in the different piles. Stock and tableau are the piles that
+    are generated at the start of the game.
+
+    Args:
+        deck: the deck of cards
+
+    Returns:
+        The stock pile (in the order the cards are drawn) and the tableau at the start
+        of a new game (only the last card of each column is face up).
+    """
+    tableau = []
+    start = 0
+    for nr_tableau in range(7):
+        # the next nr_tableau + 1 cards, reversed: the last dealt is at the bottom
+        tableau.append(deck[start : start + nr_tableau + 1][::-1])
+        start += nr_tableau + 1
+
+    return deck[start:], tableau
+
+
+def card_code(number, symbol):
+    """
+    Get the code of a card.
+
+    Args:
+        number: number of the card (1,2,..,13)
+        symbol: symbol of card (hearts,diamons,clubs,spades)
+
+    Returns:
+        The code of the card (0..51).
+    """
+    return (number - 1) * 4 + card_symbols.index(symbol)
+
+
+# Lookup tables, indexed by card code
+card_number = [card // 4 + 1 for card in range(52)]
+card_symbol = [card_symbols[card % 4] for card in range(52)]
+card_red = [symbol in red_symbols for symbol in card_symbol]
+# the card a card goes on in the foundation (None for the aces)
+foundation_below = [card - 4 if card >= 4 else None for card in range(52)]
+# tableau_fits[card][top]: card can be placed on top in the tableau
+tableau_fits = [
+    [
+        card_number[card] + 1 == card_number[top] and card_red[card] != card_red[top]
+        for top in range(52)
+    ]
+    for card in range(52)
+]
+
+
+class GameState:
+    """
+    The class GameState holds a game of Klondike (the five piles, the draw mode and
+    the number of moves) and applies the rules of the game to it. It does not use
+    pygame, so games can be played and analysed without a window.
+
+    The stock and the waste share one array, cycle: the waste is cycle[:waste_size]
+    (its last card on top) and the stock is cycle[stock_start:stock_end] (the next
+    card to draw first), with waste_size <= stock_start. Drawing a card copies
+    cycle[stock_start] to cycle[waste_size] and moves both cursors, taking the top of
+    the waste moves waste_size back, and putting the waste back in the stock only
+    makes the waste part the stock part: each is O(1) per card, no list is copied and
+    a card can never be in both. The last show_count cards of the waste are the show
+    pile; only the last one of them can be played.
+
+    The first hidden[nr] cards of tableau nr are face down, the stock is face down and
+    every other card is face up.
+    """
+
+    __slots__ = (
+        "draw_count",
+        "cycle",
+        "waste_size",
+        "stock_start",
+        "stock_end",
+        "show_count",
+        "foundation",
+        "tableau",
+        "hidden",
+        "moves",
+    )
+
+    def __init__(self, draw_count=3):
+        """
+        GameState constructor (empty piles, see new_game for a dealt game)
+
+        Args:
+            self: refer to the current instance
+            draw_count: cards drawn from the stock at a time (1 or 3, the game mode)
+
+        Returns:
+            None
+        """
+        self.draw_count = draw_count
+        self.cycle = []
+        self.waste_size = self.stock_start = self.stock_end = 0
+        self.show_count = 0
+        self.foundation = [[], [], [], []]
+        self.tableau = [[], [], [], [], [], [], []]
+        self.hidden = [0, 0, 0, 0, 0, 0, 0]
+        self.moves = 0
+
+    def deal(self, deck):
+        """
+        Deal a deck: 28 cards on the tableau and the rest in the stock.
+
+        Args:
+            self: refer to the current instance
+            deck: the (shuffled) deck of cards
+
+        Returns:
+            None
+        """
+        stock_pile, self.tableau = split_deck_in_components(deck)
+        self.hidden = [len(column) - 1 for column in self.tableau]
+        self.set_stock(stock_pile)
+        self.foundation = [[], [], [], []]
+        self.moves = 0
+
+    def copy(self):
+        """
+        Get an independent copy of the game.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The new GameState.
+        """
+        state = GameState(self.draw_count)
+        state.cycle = self.cycle[:]
+        state.waste_size = self.waste_size
+        state.stock_start = self.stock_start
+        state.stock_end = self.stock_end
+        state.show_count = self.show_count
+        state.foundation = [pile[:] for pile in self.foundation]
+        state.tableau = [pile[:] for pile in self.tableau]
+        state.hidden = self.hidden[:]
+        state.moves = self.moves
+        return state
+
+    def set_stock(self, stock, waste=(), show_count=0):
+        """
+        Put cards in the stock and the waste.
+
+        Args:
+            self: refer to the current instance
+            stock: the stock, in the order the cards are drawn
+            waste: the waste, the last card on top
+            show_count: how many cards of the waste are shown
+
+        Returns:
+            None
+        """
+        self.cycle = list(waste) + list(stock)
+        self.waste_size = self.stock_start = len(waste)
+        self.stock_end = len(self.cycle)
+        self.show_count = show_count
+
+    def stock_cards(self):
+        """
+        Get the cards of the stock.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The list of cards, in the order they are drawn.
+        """
+        return self.cycle[self.stock_start : self.stock_end]
+
+    def waste_cards(self):
+        """
+        Get the cards of the waste.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The list of cards, the last one on top.
+        """
+        return self.cycle[: self.waste_size]
+
+    def stock_size(self):
+        """
+        Get the number of cards in the stock.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The number of cards.
+        """
+        return self.stock_end - self.stock_start
+
+    def can_draw(self):
+        """
+        Verifies if clicking on the stock does anything (there are cards in the stock
+        or in the waste).
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            True/False if a card can be drawn or the waste put back
+        """
+        return self.stock_end > self.stock_start or self.waste_size > 0
+
+    def show_top(self):
+        """
+        Get the card on top of the show pile, the one that can be played.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The card, None if the show pile is empty.
+        """
+        if not self.show_count:
+            return None
+        return self.cycle[self.waste_size - 1]
+
+    def show_pile(self):
+        """
+        Get the cards of the show pile (the last one is on top).
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The list of shown cards.
+        """
+        return self.cycle[self.waste_size - self.show_count : self.waste_size]
+
+    def pile(self, location, nr):
+        """
+        Get the list of cards of a pile. The tableau and foundation piles are the
+        lists of the game, the show pile and the stock are copies.
+
+        Args:
+            self: refer to the current instance
+            location: "stock", "show", "foundation" or "tableau"
+            nr: index of the foundation or tableau pile
+
+        Returns:
+            The list of cards, the last one on top.
+        """
+        if location == "tableau":
+            return self.tableau[nr]
+        if location == "foundation":
+            return self.foundation[nr]
+        if location == "show":
+            return self.show_pile()
+        return self.stock_cards()[::-1]
+
+    def place_card_foundation(self, placed_card, nr_foundation):
+        """
+        Verifies if the a card can be placed in foundation.
+
+        Args:
+            self: refer to the current instance
+            placed_card: the card that will be placed
+            nr_foundation: which foundation pile
+
+        Returns:
+            True/False if the card can be placed in the foundation
+        """
+        pile = self.foundation[nr_foundation]
+        if pile:
+            return pile[-1] == foundation_below[placed_card]
+        return placed_card < 4
+
+    def place_card_tableau(self, placed_card, nr_tableau):
+        """
+        Verifies if the a card can be placed in tableau.
+
+        Args:
+            self: refer to the current instance
+            placed_card: the card that will be placed
+            nr_tableau: which tableau pile
+
+        Returns:
+            True/False if the card can be placed in the tableau
+        """
+        pile = self.tableau[nr_tableau]
+        if pile:
+            return tableau_fits[placed_card][pile[-1]]
+        return placed_card >= 48
+
+    def stock_draw(self):
+        """
+        Draw cards from the stock to the show pile, or put the waste back in the stock
+        when the stock is empty.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            True/False if anything changed
+        """
+        cycle = self.cycle
+        if self.stock_start < self.stock_end:
+            # the same loop for draw-1 and draw-3
+            for _ in range(min(self.draw_count, self.stock_end - self.stock_start)):
+                cycle[self.waste_size] = cycle[self.stock_start]
+                self.waste_size += 1
+                self.stock_start += 1
+            # near the end of the stock the show pile is completed from the waste
+            self.show_count = min(self.draw_count, self.waste_size)
+        elif self.waste_size:
+            self.stock_start, self.stock_end = 0, self.waste_size
+            self.waste_size = 0
+            self.show_count = 0
+        else:
+            return False
+
+        self.moves += 1
+        return True
+
+    def legal(self, move):
+        """
+        Verifies if a move follows the rules.
+
+        Args:
+            self: refer to the current instance
+            move: (source, source_nr, count, destination, destination_nr)
+
+        Returns:
+            True/False if the move can be made
+        """
+        source, source_nr, count, destination, destination_nr = move
+        if source == "stock":
+            return self.can_draw()
+        if (source, source_nr) == (destination, destination_nr):
+            return False
+
+        if source == "show":
+            if count != 1 or not self.show_count:
+                return False
+            card = self.cycle[self.waste_size - 1]
+        else:
+            if source == "foundation":
+                pile = self.foundation[source_nr]
+                if count != 1:
+                    return False
+            elif source == "tableau":
+                pile = self.tableau[source_nr]
+            else:
+                return False
+            if count < 1 or count > len(pile):
+                return False
+            if source == "tableau" and len(pile) - count < self.hidden[source_nr]:
+                return False
+            card = pile[-count]
+
+        if destination == "foundation":
+            return count == 1 and self.place_card_foundation(card, destination_nr)
+        if destination == "tableau":
+            return self.place_card_tableau(card, destination_nr)
+        return False
+
+    def apply(self, move):
+        """
+        Make a move if it follows the rules. A tableau card left on top face down
+        is turned face up.
+
+        Args:
+            self: refer to the current instance
+            move: (source, source_nr, count, destination, destination_nr)
+
+        Returns:
+            True/False if the move was made
+        """
+        if not self.legal(move):
+            return False
+
+        source, source_nr, count, destination, destination_nr = move
+        if source == "stock":
+            return self.stock_draw()
+
+        if source == "show":
+            self.waste_size -= 1
+            self.show_count -= 1
+            cards = [self.cycle[self.waste_size]]
+        else:
+            pile = self.pile(source, source_nr)
+            cards = pile[-count:]
+            del pile[-count:]
+            if source == "tableau" and self.hidden[source_nr] == len(pile) > 0:
+                self.hidden[source_nr] -= 1
+        self.pile(destination, destination_nr).extend(cards)
+
+        self.moves += 1
+        return True
+
+    def stock_undraw(self, count):
+        """
+        Put the last cards drawn back on the stock (to undo a draw).
+
+        Args:
+            self: refer to the current instance
+            count: number of cards drawn
+
+        Returns:
+            None
+        """
+        cycle = self.cycle
+        for _ in range(count):
+            self.waste_size -= 1
+            self.stock_start -= 1
+            cycle[self.stock_start] = cycle[self.waste_size]
+
+    def stock_unrecycle(self):
+        """
+        Make the stock the waste again (to undo putting the waste back in the stock).
+        A card taken from the waste and put back leaves a gap before the stock, so
+        the stock is moved to the start of the cycle first. The empty stock is left at
+        the end of the cycle.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        size = self.stock_end - self.stock_start
+        if self.stock_start:
+            self.cycle[:size] = self.cycle[self.stock_start : self.stock_end]
+        self.waste_size = size
+        self.stock_start = self.stock_end = len(self.cycle)
+
+    def return_to_show(self, card):
+        """
+        Put a card back on top of the waste (to undo playing it).
+
+        Args:
+            self: refer to the current instance
+            card: the card
+
+        Returns:
+            None
+        """
+        self.cycle[self.waste_size] = card
+        self.waste_size += 1
+
+    def face_up(self, nr_tableau, index):
+        """
+        Verifies if a card of the tableau is face up.
+
+        Args:
+            self: refer to the current instance
+            nr_tableau: tableau index
+            index: index of the card in the column
+
+        Returns:
+            True/False if the card is face up
+        """
+        return index >= self.hidden[nr_tableau]
+
+    def won(self):
+        """
+        Verifies if the foundation pile is completed and the game is finished
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            True/False if the game is finished
+        """
+        return all(len(pile) == 13 for pile in self.foundation)
+
+
+# The piles as numbers 0..12, for the move log: stock, show, foundation 0..3 and
+# tableau 0..6
+log_piles = (
+    [("stock", 0), ("show", 0)]
+    + [("foundation", nr) for nr in range(4)]
+    + [("tableau", nr) for nr in range(7)]
+)
+log_pile_codes = {pile: code for code, pile in enumerate(log_piles)}
+
+
+class MoveLog:
+    """
+    The class MoveLog makes the moves of a game and keeps them for undo and redo.
+    A move is kept as 2 bytes: the source and destination piles (4 bits each), the
+    number of cards (5 bits), if a tableau card was turned face up and the size of
+    the show pile before the move (2 bits). A stock draw goes from the stock to the
+    show pile; putting the waste back in the stock goes from the show pile to the
+    stock with every card of the waste.
+    """
+
+    def __init__(self, state):
+        """
+        MoveLog constructor
+
+        Args:
+            self: refer to the current instance
+            state: the GameState the moves are made on
+
+        Returns:
+            None
+        """
+        self.state = state
+        self.done = bytearray()
+        self.undone = bytearray()
+
+    def encode(self, move):
+        """
+        Get the entry of a move that is about to be made.
+
+        Args:
+            self: refer to the current instance
+            move: (source, source_nr, count, destination, destination_nr)
+
+        Returns:
+            The 2 bytes of the entry.
+        """
+        state = self.state
+        source, source_nr, count, destination, destination_nr = move
+        flipped = 0
+        if source == "stock":
+            if state.stock_size():
+                count = min(state.draw_count, state.stock_size())
+            else:
+                source, destination, count = "show", "stock", state.waste_size
+        elif source == "tableau":
+            hidden = state.hidden[source_nr]
+            flipped = int(
+                hidden > 0 and hidden == len(state.tableau[source_nr]) - count
+            )
+
+        return bytes(
+            (
+                log_pile_codes[source, source_nr] << 4
+                | log_pile_codes[destination, destination_nr],
+                count << 3 | flipped << 2 | state.show_count,
+            )
+        )
+
+    def decode(self, entry):
+        """
+        Get the move of an entry.
+
+        Args:
+            self: refer to the current instance
+            entry: the 2 bytes of the entry
+
+        Returns:
+            The move, the number of cards moved, if a card was turned and the size
+            of the show pile before the move.
+        """
+        source, source_nr = log_piles[entry[0] >> 4]
+        destination, destination_nr = log_piles[entry[0] & 15]
+        count, flipped, show_count = entry[1] >> 3, entry[1] >> 2 & 1, entry[1] & 3
+        if source == "stock" or destination == "stock":
+            move = draw_move
+        else:
+            move = (source, source_nr, count, destination, destination_nr)
+        return move, count, flipped, show_count
+
+    def play(self, move):
+        """
+        Make a move if it follows the rules and log it (the moves undone before are
+        forgotten).
+
+        Args:
+            self: refer to the current instance
+            move: (source, source_nr, count, destination, destination_nr)
+
+        Returns:
+            True/False if the move was made
+        """
+        if not self.state.legal(move):
+            return False
+        entry = self.encode(move)
+        self.state.apply(move)
+        self.done += entry
+        self.undone.clear()
+        return True
+
+    def undo_move(self):
+        """
+        Get the move undo() would take back, to know the piles it will change.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The move, None if there is nothing to undo.
+        """
+        if not self.done:
+            return None
+        return self.decode(self.done[-2:])[0]
+
+    def redo_move(self):
+        """
+        Get the move redo() would make again.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The move, None if there is nothing to redo.
+        """
+        if not self.undone:
+            return None
+        return self.decode(self.undone[-2:])[0]
+
+    def undo(self):
+        """
+        Take back the last move, moving only its cards.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The move taken back, None if there is nothing to undo.
+        """
+        if not self.done:
+            return None
+        entry = self.done[-2:]
+        del self.done[-2:]
+        self.undone += entry
+
+        state = self.state
+        move, count, flipped, show_count = self.decode(entry)
+        source, source_nr, _, destination, destination_nr = move
+        if log_piles[entry[0] & 15] == ("stock", 0):
+            # the waste was put back in the stock
+            state.stock_unrecycle()
+        elif source == "stock":
+            state.stock_undraw(count)
+        else:
+            pile = state.pile(destination, destination_nr)
+            cards = pile[-count:]
+            del pile[-count:]
+            if source == "show":
+                state.return_to_show(cards[0])
+            else:
+                if flipped:
+                    state.hidden[source_nr] += 1
+                state.pile(source, source_nr).extend(cards)
+
+        state.show_count = show_count
+        state.moves -= 1
+        return move
+
+    def redo(self):
+        """
+        Make again the last move taken back.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The move made, None if there is nothing to redo.
+        """
+        if not self.undone:
+            return None
+        entry = self.undone[-2:]
+        del self.undone[-2:]
+        move = self.decode(entry)[0]
+        self.state.apply(move)
+        self.done += entry
+        return move
+
+
+def new_game(draw_count=3, rng=random):
+    """
+    Deal a new game from a freshly shuffled deck.
+
+    Args:
+        draw_count: cards drawn from the stock at a time (1 or 3)
+        rng: the random generator used to shuffle
+
+    Returns:
+        The GameState of the new game.
+    """
+    deck = generate_card_deck()
+    shuffle_deck(deck, rng)
+    state = GameState(draw_count)
+    state.deal(deck)
+    return state
+
+
+def seeded_game(seed, draw_count=3):
+    """
+    Deal the game of a seed: a seed always deals the same cards, so a deal can be
+    played again, analysed and stored as a number.
+
+    Args:
+        seed: the seed of the deal (an integer)
+        draw_count: cards drawn from the stock at a time (1 or 3)
+
+    Returns:
+        The GameState of the new game.
+    """
+    return new_game(draw_count, random.Random(seed))
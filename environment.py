@@ -0,0 +1,306 @@
+import argparse
+import random
+import time
+
+import engine
+from moves import all_moves, move_piles, pair_moves
+
+# Actions: 0 is a click on the stock, then one action per (source pile, destination
+# pile) pair, the piles of moves.move_piles; a move between two columns takes the
+# cards that fit the destination, so the pair is enough to tell the move. Most pairs
+# are never legal (a card going back to the show pile, a foundation pile to another).
+action_destinations = move_piles[1:]
+action_count = 1 + len(move_piles) * len(action_destinations)
+action_piles = [None] + [
+    (source, destination)
+    for source in move_piles
+    for destination in action_destinations
+]
+action_index = {piles: action for action, piles in enumerate(action_piles) if piles}
+
+# Observation: one byte per place of the board, a card being its code + 1, 0 an empty
+# place and face_down a face down card (the player does not see it either):
+#   the 7 tableau columns, max_column places each, the first card first
+#   the top card of each foundation pile
+#   the show pile, the cards that can be seen, the playable one last
+#   the number of cards in the stock and in the waste, the draw count
+face_down = 53
+max_column = 19
+tableau_offset = 0
+foundation_offset = tableau_offset + 7 * max_column
+show_offset = foundation_offset + 4
+counts_offset = show_offset + 3
+observation_size = counts_offset + 3
+# bytes.translate() table from the card codes to their bytes in the observation
+observed_cards = bytes(range(1, 53)) + bytes(204)
+
+# rewards: cards put in the foundation (taken back ones count against it), and an
+# action that is not legal (nothing happens)
+foundation_reward = 1.0
+illegal_reward = -1.0
+
+
+class SolitaireEnv:
+    """
+    The class SolitaireEnv plays games for agents, with the reset/step interface of
+    the reinforcement learning environments: fixed-size integer observations, a
+    fixed set of actions and the mask of the legal ones. It uses the rules of
+    engine.GameState, without pygame or a window.
+    """
+
+    def __init__(self, draw_count=3, max_steps=1000, seed=None):
+        """
+        SolitaireEnv constructor
+
+        Args:
+            self: refer to the current instance
+            draw_count: cards drawn from the stock at a time (1 or 3)
+            max_steps: steps before an episode is cut (None for no limit)
+            seed: seed of the random generator that picks the deals
+
+        Returns:
+            None
+        """
+        self.draw_count = draw_count
+        self.max_steps = max_steps
+        self.rng = random.Random(seed)
+        self.state = None
+        self.seed = None
+        self.steps = 0
+        self.mask = None
+        # the observation kept up to date, only the piles a move changes are encoded
+        # again (the show pile and the counts are encoded for every observation)
+        self.encoded = None
+
+    def reset(self, seed=None, draw_count=None):
+        """
+        Deal a new game.
+
+        Args:
+            self: refer to the current instance
+            seed: the seed of the deal (None for one picked by the environment)
+            draw_count: the draw mode of this game and the next ones (None to keep it)
+
+        Returns:
+            (observation, info)
+        """
+        if draw_count is not None:
+            self.draw_count = draw_count
+        if seed is None:
+            seed = self.rng.randrange(2**32)
+        self.seed = seed
+        self.state = engine.seeded_game(seed, self.draw_count)
+        self.steps = 0
+        self.mask = None
+        self.encoded = None
+        return self.observation(), self.info()
+
+    def step(self, action):
+        """
+        Make the move of an action.
+
+        Args:
+            self: refer to the current instance
+            action: the action (0..action_count-1)
+
+        Returns:
+            (observation, reward, terminated, truncated, info): terminated when the
+            game is won or no move is left, truncated after max_steps steps.
+        """
+        state = self.state
+        move = self.action_move(action)
+        self.steps += 1
+        if move is None or not state.legal(move):
+            reward = illegal_reward
+        else:
+            location, to_location = move[0], move[3]
+            state.apply(move)
+            self.mask = None
+            self.touch(move)
+            reward = 0.0
+            if to_location == "foundation":
+                reward = foundation_reward
+            elif location == "foundation":
+                reward = -foundation_reward
+
+        # no move is left only when the stock can not be clicked any more
+        terminated = state.won() or (
+            not state.can_draw() and not any(self.action_mask())
+        )
+        truncated = (
+            not terminated
+            and self.max_steps is not None
+            and self.steps >= self.max_steps
+        )
+        return self.observation(), reward, terminated, truncated, self.info()
+
+    def action_move(self, action):
+        """
+        Get the move of an action in the current position.
+
+        Args:
+            self: refer to the current instance
+            action: the action (0..action_count-1)
+
+        Returns:
+            The move, None if the action can not be made.
+        """
+        if action == 0:
+            return engine.draw_move
+        source, destination = action_piles[action]
+        if source[0] == "foundation" and destination[0] != "tableau":
+            # foundation cards only go back to the tableau, as in moves.all_moves
+            return None
+        if source[0] == "tableau" and destination[0] == "tableau":
+            tableau_moves = pair_moves(self.state, source, destination)
+            return tableau_moves[0] if tableau_moves else None
+        return source + (1,) + destination
+
+    def action_mask(self):
+        """
+        Get the legal actions of the current position.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            A bytearray of action_count bytes, 1 for a legal action.
+        """
+        if self.mask is None:
+            mask = bytearray(action_count)
+            for move in all_moves(self.state):
+                if move[0] == "stock":
+                    mask[0] = 1
+                else:
+                    mask[action_index[(move[0], move[1]), (move[3], move[4])]] = 1
+            self.mask = mask
+        return self.mask
+
+    def touch(self, move):
+        """
+        Encode again the tableau and foundation piles changed by a move (after it
+        was made on the state).
+
+        Args:
+            self: refer to the current instance
+            move: the move that was made
+
+        Returns:
+            None
+        """
+        if self.encoded is None:
+            return
+        for location, nr in ((move[0], move[1]), (move[3], move[4])):
+            if location == "tableau":
+                self.encode_column(nr)
+            elif location == "foundation":
+                self.encode_foundation(nr)
+
+    def encode_column(self, nr_tableau):
+        """
+        Encode a tableau column in the kept observation.
+
+        Args:
+            self: refer to the current instance
+            nr_tableau: tableau index
+
+        Returns:
+            None
+        """
+        column = self.state.tableau[nr_tableau]
+        hidden = self.state.hidden[nr_tableau]
+        start = tableau_offset + nr_tableau * max_column
+        self.encoded[start : start + max_column] = (
+            bytes((face_down,)) * hidden
+            + bytes(column[hidden:]).translate(observed_cards)
+            + bytes(max_column - len(column))
+        )
+
+    def encode_foundation(self, nr_foundation):
+        """
+        Encode the top card of a foundation pile in the kept observation.
+
+        Args:
+            self: refer to the current instance
+            nr_foundation: foundation index
+
+        Returns:
+            None
+        """
+        pile = self.state.foundation[nr_foundation]
+        self.encoded[foundation_offset + nr_foundation] = pile[-1] + 1 if pile else 0
+
+    def observation(self):
+        """
+        Encode the current position (see the observation layout above).
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            A new bytearray of observation_size bytes.
+        """
+        state = self.state
+        if self.encoded is None:
+            self.encoded = bytearray(observation_size)
+            for nr_tableau in range(7):
+                self.encode_column(nr_tableau)
+            for nr_foundation in range(4):
+                self.encode_foundation(nr_foundation)
+        observation = self.encoded
+        show_pile = state.show_pile()
+        observation[show_offset:counts_offset] = bytes(show_pile).translate(
+            observed_cards
+        ) + bytes(counts_offset - show_offset - len(show_pile))
+        observation[counts_offset] = state.stock_size()
+        observation[counts_offset + 1] = state.waste_size
+        observation[counts_offset + 2] = state.draw_count
+        return bytearray(observation)
+
+    def info(self):
+        """
+        Get the details of the episode that are not part of the observation.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            A dictionary with the seed of the deal, the steps, the moves made and
+            the cards in the foundation.
+        """
+        return {
+            "seed": self.seed,
+            "steps": self.steps,
+            "moves": self.state.moves,
+            "foundation": sum(len(pile) for pile in self.state.foundation),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play random legal actions to measure the speed of the environment."
+    )
+    parser.add_argument("--steps", type=int, default=100000)
+    parser.add_argument("--mode", type=int, choices=[1, 3], default=3)
+    parser.add_argument("--max-steps", type=int, default=1000, help="episode length")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = SolitaireEnv(args.mode, args.max_steps, args.seed)
+    rng = random.Random(args.seed)
+    env.reset()
+    episodes = won = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        mask = env.action_mask()
+        action = rng.choice([action for action, legal in enumerate(mask) if legal])
+        observation, reward, terminated, truncated, info = env.step(action)
+        if terminated or truncated:
+            episodes += 1
+            won += env.state.won()
+            env.reset()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{args.steps} steps in {elapsed:.2f} s ({args.steps / elapsed:.0f} steps/s), "
+        f"{episodes} episodes, {won} won"
+    )
@@ -0,0 +1,356 @@
+import csv
+import json
+import math
+import time
+from collections import deque
+
+import pygame
+
+
+class FramePolicy:
+    """
+    The class FramePolicy decides how the main loop waits for the next frame.
+    While something moves (a drag, an animation) it runs at the full frame rate;
+    otherwise it blocks on the event queue, waking up only every idle_timeout
+    milliseconds to refresh the counters. It measures the CPU time used in each mode.
+    """
+
+    def __init__(self, active_fps=60, idle_timeout=1000, idle_fps=0):
+        """
+        FramePolicy constructor
+
+        Args:
+            self: refer to the current instance
+            active_fps: frame rate while something moves
+            idle_timeout: longest wait (ms) for an event while nothing moves
+                          (0 to never block, i.e. always run at active_fps)
+            idle_fps: frame rate cap while nothing moves (0 for no cap)
+
+        Returns:
+            None
+        """
+        self.active_fps = active_fps
+        self.idle_timeout = idle_timeout
+        self.idle_fps = idle_fps
+        self.modes = {
+            "active": {"frames": 0, "wall": 0.0, "cpu": 0.0},
+            "idle": {"frames": 0, "wall": 0.0, "cpu": 0.0},
+        }
+        self.last_wall = time.perf_counter()
+        self.last_cpu = time.process_time()
+
+    def events(self, busy):
+        """
+        Get the events of the frame. While nothing moves, wait for the first one.
+
+        Args:
+            self: refer to the current instance
+            busy: True if something moves on the screen
+
+        Returns:
+            The list of events.
+        """
+        if busy or self.idle_timeout <= 0:
+            return pygame.event.get()
+
+        event = pygame.event.wait(self.idle_timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def tick(self, clock, busy):
+        """
+        End the frame: wait if needed to keep the frame rate and account the time
+        of the frame to its mode.
+
+        Args:
+            self: refer to the current instance
+            clock: the pygame clock
+            busy: True if something moved during the frame
+
+        Returns:
+            None
+        """
+        if busy or self.idle_timeout <= 0:
+            mode = "active"
+            clock.tick(self.active_fps)
+        else:
+            mode = "idle"
+            clock.tick(self.idle_fps)
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        self.modes[mode]["frames"] += 1
+        self.modes[mode]["wall"] += wall - self.last_wall
+        self.modes[mode]["cpu"] += cpu - self.last_cpu
+        self.last_wall, self.last_cpu = wall, cpu
+
+    def stats(self):
+        """
+        Get the frames, time and CPU usage of each mode.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            A dictionary with the statistics of the "active" and "idle" modes.
+        """
+        stats = {}
+        for mode, totals in self.modes.items():
+            stats[mode] = {
+                "frames": totals["frames"],
+                "wall_seconds": round(totals["wall"], 3),
+                "cpu_seconds": round(totals["cpu"], 3),
+                "cpu_percent": (
+                    round(100 * totals["cpu"] / totals["wall"], 1)
+                    if totals["wall"]
+                    else 0.0
+                ),
+            }
+        return stats
+
+    def report(self):
+        """
+        Get the CPU usage of each mode as text.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            One line per mode.
+        """
+        lines = []
+        for mode, stats in self.stats().items():
+            lines.append(
+                f"{mode}: {stats['frames']} frames, {stats['wall_seconds']} s, "
+                f"CPU {stats['cpu_seconds']} s ({stats['cpu_percent']}%)"
+            )
+        return "\n".join(lines)
+
+
+class PhaseHistogram:
+    """
+    The class PhaseHistogram keeps the durations of the last window samples of one
+    phase in log-spaced buckets (5% wide), so recording is O(1) and the percentiles
+    of the recent frames are read without sorting.
+    """
+
+    # bucket i holds the durations from min_seconds * growth**i to
+    # min_seconds * growth**(i + 1)
+    min_seconds = 1e-6
+    growth = 1.05
+    bucket_count = 340  # up to about 16 s
+
+    def __init__(self, window=1000):
+        """
+        PhaseHistogram constructor
+
+        Args:
+            self: refer to the current instance
+            window: how many of the most recent samples the percentiles cover
+
+        Returns:
+            None
+        """
+        self.buckets = [0] * self.bucket_count
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """
+        Add one duration; the oldest one leaves the window when it is full.
+
+        Args:
+            self: refer to the current instance
+            seconds: the duration
+
+        Returns:
+            None
+        """
+        if seconds > self.min_seconds:
+            bucket = int(math.log(seconds / self.min_seconds, self.growth))
+            bucket = min(bucket, self.bucket_count - 1)
+        else:
+            bucket = 0
+
+        if len(self.recent) == self.recent.maxlen:
+            self.buckets[self.recent[0]] -= 1
+        self.recent.append(bucket)
+        self.buckets[bucket] += 1
+
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """
+        Get a percentile of the samples in the window.
+
+        Args:
+            self: refer to the current instance
+            fraction: the percentile as a fraction (0.5, 0.95, 0.99)
+
+        Returns:
+            The duration in seconds (the middle of its bucket, at most the longest
+            duration seen), 0 without samples.
+        """
+        if not self.recent:
+            return 0.0
+        rank = math.ceil(fraction * len(self.recent))
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                break
+        return min(self.min_seconds * self.growth ** (bucket + 0.5), self.max)
+
+
+class PhaseProfiler:
+    """
+    The class PhaseProfiler times the phases of the main loop (event handling,
+    restoring the board, the moving cards, the HUD, display.update), keeping a rolling
+    histogram per phase, and writes their p50/p95/p99 to a CSV or JSON file.
+    """
+
+    def __init__(self, phases=(), window=1000):
+        """
+        PhaseProfiler constructor
+
+        Args:
+            self: refer to the current instance
+            phases: names of the phases, in the order they are reported
+                    (other phases are added when first recorded)
+            window: how many of the most recent frames the percentiles cover
+
+        Returns:
+            None
+        """
+        self.window = window
+        self.phases = {phase: PhaseHistogram(window) for phase in phases}
+        self.started = {}
+
+    def start(self, phase):
+        """
+        Start timing a phase.
+
+        Args:
+            self: refer to the current instance
+            phase: name of the phase
+
+        Returns:
+            None
+        """
+        self.started[phase] = time.perf_counter()
+
+    def stop(self, phase):
+        """
+        Stop timing a phase and record its duration.
+
+        Args:
+            self: refer to the current instance
+            phase: name of the phase (started with start)
+
+        Returns:
+            None
+        """
+        self.record(phase, time.perf_counter() - self.started.pop(phase))
+
+    def record(self, phase, seconds):
+        """
+        Record a duration measured elsewhere.
+
+        Args:
+            self: refer to the current instance
+            phase: name of the phase
+            seconds: the duration
+
+        Returns:
+            None
+        """
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = PhaseHistogram(self.window)
+            self.phases[phase] = histogram
+        histogram.record(seconds)
+
+    def stats(self):
+        """
+        Get the statistics of every phase, in milliseconds.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            A list with one dictionary per phase (samples, mean, p50, p95, p99, max).
+        """
+        stats = []
+        for phase, histogram in self.phases.items():
+            if not histogram.count:
+                continue
+            stats.append(
+                {
+                    "phase": phase,
+                    "samples": histogram.count,
+                    "mean_ms": round(1000 * histogram.total / histogram.count, 4),
+                    "p50_ms": round(1000 * histogram.percentile(0.50), 4),
+                    "p95_ms": round(1000 * histogram.percentile(0.95), 4),
+                    "p99_ms": round(1000 * histogram.percentile(0.99), 4),
+                    "max_ms": round(1000 * histogram.max, 4),
+                }
+            )
+        return stats
+
+    def report(self):
+        """
+        Get the percentiles of every phase as text.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            One line per phase.
+        """
+        lines = []
+        for stats in self.stats():
+            lines.append(
+                f"{stats['phase']}: {stats['samples']} samples, "
+                f"p50 {stats['p50_ms']} ms, p95 {stats['p95_ms']} ms, "
+                f"p99 {stats['p99_ms']} ms, max {stats['max_ms']} ms"
+            )
+        return "\n".join(lines)
+
+    def dump(self, filename):
+        """
+        Write the statistics of every phase to a CSV file, or to a JSON file if the
+        name ends with .json.
+
+        Args:
+            self: refer to the current instance
+            filename: name of the output file
+
+        Returns:
+            None
+        """
+        stats = self.stats()
+        if filename.endswith(".json"):
+            with open(filename, "w") as file:
+                json.dump(stats, file, indent=1)
+            return
+
+        with open(filename, "w", newline="") as file:
+            writer = csv.DictWriter(
+                file,
+                fieldnames=[
+                    "phase",
+                    "samples",
+                    "mean_ms",
+                    "p50_ms",
+                    "p95_ms",
+                    "p99_ms",
+                    "max_ms",
+                ],
+            )
+            writer.writeheader()
+            writer.writerows(stats)
@@ -0,0 +1,193 @@
+import argparse
+import csv
+import json
+import os
+import random
+import time
+
+# no window: the SDL dummy video driver (set before pygame starts)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import solitaire
+
+
+def make_event(description):
+    """
+    Create a pygame event from its description, e.g.
+    {"type": "MOUSEBUTTONDOWN", "pos": [60, 60], "button": 1}.
+
+    Args:
+        description: dictionary with the event type name and its attributes
+
+    Returns:
+        The pygame event.
+    """
+    attributes = {}
+    for name, value in description.items():
+        if name != "type":
+            attributes[name] = tuple(value) if isinstance(value, list) else value
+    if "size" in attributes:
+        attributes.setdefault("w", attributes["size"][0])
+        attributes.setdefault("h", attributes["size"][1])
+
+    return pygame.event.Event(getattr(pygame, description["type"]), attributes)
+
+
+def load_script(filename):
+    """
+    Read a script of input events: one JSON list of events per line, one line per
+    frame (an empty list is a frame without input).
+
+    Args:
+        filename: name of the script file
+
+    Returns:
+        The list of frames, each a list of pygame events.
+    """
+    frames = []
+    with open(filename, "r") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                frames.append([make_event(event) for event in json.loads(line)])
+    return frames
+
+
+def run(
+    frames,
+    size=(1000, 750),
+    seed=None,
+    frames_directory=None,
+    every=1,
+    full_redraw=False,
+):
+    """
+    Run the game without a window: start it, feed the events of every frame to the
+    game's own handlers and draw each frame, timing the work.
+
+    Args:
+        frames: list of frames, each a list of pygame events
+        size: (width, height) of the (invisible) window
+        seed: seed of the deal (None for a random deal)
+        frames_directory: folder where the frames are saved as PNG (None to not save)
+        every: save one frame out of every
+        full_redraw: draw the whole board (draw_cards) every frame
+
+    Returns:
+        The list of timings, one dictionary per frame.
+    """
+    if seed is not None:
+        random.seed(seed)
+    solitaire.start_game(size, 0)
+    if frames_directory:
+        os.makedirs(frames_directory, exist_ok=True)
+
+    timings = []
+    for index, events in enumerate(frames):
+        start = time.perf_counter()
+        solitaire.profiler.start("frame")
+        solitaire.profiler.start("events")
+        quit_requested = False
+        for event in events:
+            if event.type == pygame.QUIT:
+                quit_requested = True
+                break
+            if event.type == pygame.VIDEORESIZE:
+                pygame.display.set_mode(event.size, 0)
+            solitaire.handle_event(event)
+        solitaire.profiler.stop("events")
+        handled = time.perf_counter()
+
+        if full_redraw:
+            solitaire.draw_cards(solitaire.screen)
+        solitaire.draw_frame()
+        solitaire.profiler.start("update")
+        rects = solitaire.compositor.flush()
+        pygame.display.update(rects)
+        solitaire.profiler.stop("update")
+        solitaire.profiler.stop("frame")
+        drawn = time.perf_counter()
+
+        timings.append(
+            {
+                "frame": index,
+                "events": len(events),
+                "event_ms": round((handled - start) * 1000, 4),
+                "draw_ms": round((drawn - handled) * 1000, 4),
+                "frame_ms": round((drawn - start) * 1000, 4),
+                "dirty_rects": solitaire.compositor.last_rects,
+                "dirty_area": solitaire.compositor.last_area,
+            }
+        )
+        if frames_directory and index % every == 0:
+            pygame.image.save(
+                solitaire.screen,
+                os.path.join(frames_directory, f"frame_{index:05d}.png"),
+            )
+        solitaire.clock.tick()
+
+        if quit_requested:
+            break
+
+    return timings
+
+
+def write_timings(timings, filename):
+    """
+    Write the timings to a CSV file, or to a JSON file if the name ends with .json.
+
+    Args:
+        timings: the list of timings returned by run()
+        filename: name of the output file
+
+    Returns:
+        None
+    """
+    if filename.endswith(".json"):
+        with open(filename, "w") as file:
+            json.dump(timings, file, indent=1)
+        return
+
+    with open(filename, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(timings[0]) if timings else [])
+        writer.writeheader()
+        writer.writerows(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the game without a window.")
+    parser.add_argument("script", help="input events, one JSON list per frame")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=750)
+    parser.add_argument("--frames", help="folder for the PNG frames")
+    parser.add_argument("--every", type=int, default=1, help="save every Nth frame")
+    parser.add_argument("--timings", help="CSV (or .json) file for the frame timings")
+    parser.add_argument("--profile", help="CSV (or .json) file for the phase times")
+    parser.add_argument("--full-redraw", action="store_true")
+    args = parser.parse_args()
+
+    timings = run(
+        load_script(args.script),
+        (args.width, args.height),
+        args.seed,
+        args.frames,
+        args.every,
+        args.full_redraw,
+    )
+    if args.timings:
+        write_timings(timings, args.timings)
+    if args.profile:
+        solitaire.profiler.dump(args.profile)
+        print(solitaire.profiler.report())
+
+    total = sum(timing["frame_ms"] for timing in timings)
+    print(
+        f"{len(timings)} frames, {total:.1f} ms, "
+        f"{total / max(len(timings), 1):.3f} ms per frame"
+    )
+    print(solitaire.card_images.report())
+    print(solitaire.card_asset_sets.report())
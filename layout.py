@@ -0,0 +1,352 @@
+import pygame
+
+# Card spacing (different constants for drawing and card positions), for the
+# 1000x750 board; BoardLayout scales them to the size of the window:
+base_board_width, base_board_height = 1000, 750  # board dimension
+base_card_width, base_card_height = 100, 150  # card dimension
+base_space_width, base_space_height = 30, 15  # spacing from the left up corner
+base_space_cards = 15  # space between cards
+base_space_show, base_space_tableau = (
+    25,
+    30,
+)  # space right between show_pile cards/ space down between cards in tableau
+
+# smaller windows show a part of the board: below it the cards and spaces round to
+# a few pixels (and the hit grid cells to none)
+min_board_scale = 0.25
+
+# the longest tableau column: 6 face down cards and a king to an ace
+max_tableau_cards = 19
+# cards can be dropped on a column up to this many card spaces below its last card
+drop_rows = 4
+
+
+def fit_scale(size):
+    """
+    Get the scale of the board that fits in a window.
+
+    Args:
+        size: (width, height) of the window
+
+    Returns:
+        The scale (1 for the 1000x750 window), at least min_board_scale.
+    """
+    return max(
+        min_board_scale, min(size[0] / base_board_width, size[1] / base_board_height)
+    )
+
+
+class HitGrid:
+    """
+    The class HitGrid finds the region of the board under a point in constant time:
+    the board is cut in cells of a fixed size and each cell keeps the few regions
+    that overlap it, so a lookup tests only those.
+    """
+
+    def __init__(self, regions, cell_size):
+        """
+        HitGrid constructor
+
+        Args:
+            self: refer to the current instance
+            regions: list of (key, rectangle), the rectangles do not overlap
+            cell_size: (width, height) of the cells
+
+        Returns:
+            None
+        """
+        self.cell_width, self.cell_height = cell_size
+        self.cells = {}
+        for key, rect in regions:
+            rect = pygame.Rect(rect)
+            for cell in self.cells_of(rect):
+                self.cells.setdefault(cell, []).append((key, rect))
+
+    def cells_of(self, rect):
+        """
+        Get the cells a rectangle overlaps.
+
+        Args:
+            self: refer to the current instance
+            rect: the rectangle
+
+        Returns:
+            The list of (column, row) of the cells.
+        """
+        return [
+            (column, row)
+            for column in range(
+                rect.left // self.cell_width, (rect.right - 1) // self.cell_width + 1
+            )
+            for row in range(
+                rect.top // self.cell_height, (rect.bottom - 1) // self.cell_height + 1
+            )
+        ]
+
+    def at(self, point):
+        """
+        Get the region under a point.
+
+        Args:
+            self: refer to the current instance
+            point: (x, y) on the screen
+
+        Returns:
+            The key of the region, None if there is none.
+        """
+        cell = (point[0] // self.cell_width, point[1] // self.cell_height)
+        for key, rect in self.cells.get(cell, ()):
+            if rect.collidepoint(point):
+                return key
+        return None
+
+    def touching(self, rect):
+        """
+        Get the regions a rectangle overlaps.
+
+        Args:
+            self: refer to the current instance
+            rect: the rectangle
+
+        Returns:
+            The list of keys of the regions.
+        """
+        keys = []
+        for cell in self.cells_of(rect):
+            for key, region in self.cells.get(cell, ()):
+                if key not in keys and region.colliderect(rect):
+                    keys.append(key)
+        return keys
+
+
+class BoardLayout:
+    """
+    The class BoardLayout computes the measurements of the board for a window size,
+    once: the card and spacing dimensions, the rectangle of every pile, button and
+    card place, and the hit grids that map a point of the screen to what is under it
+    (for the clicks, the drops and the regions to draw again).
+    """
+
+    def __init__(self, scale):
+        """
+        BoardLayout constructor
+
+        Args:
+            self: refer to the current instance
+            scale: the scale of the board (1 for the 1000x750 window)
+
+        Returns:
+            None
+        """
+        self.scale = scale
+        self.card_width = round(base_card_width * scale)
+        self.card_height = round(base_card_height * scale)
+        self.space_width = round(base_space_width * scale)
+        self.space_height = round(base_space_height * scale)
+        self.space_cards = round(base_space_cards * scale)
+        self.space_show = round(base_space_show * scale)
+        self.space_tableau = round(base_space_tableau * scale)
+        card_width, card_height = self.card_width, self.card_height
+        step = card_width + self.space_cards
+
+        # spacing from left top corner
+        self.stock_position = (self.space_width, self.space_height)
+        self.show_position = (self.space_width + step, self.space_height)
+        self.foundation_position = (self.space_width + step * 3, self.space_height)
+        self.tableau_position = (
+            self.space_width,
+            card_height + self.space_height + self.space_cards * 2,
+        )
+
+        # the place of every card
+        show_x, show_y = self.show_position
+        foundation_x, foundation_y = self.foundation_position
+        tableau_x, tableau_y = self.tableau_position
+        self.show_cards = [
+            pygame.Rect(
+                show_x + self.space_show * index, show_y, card_width, card_height
+            )
+            for index in range(3)
+        ]
+        self.foundation_cards = [
+            pygame.Rect(foundation_x + step * nr, foundation_y, card_width, card_height)
+            for nr in range(4)
+        ]
+        self.tableau_cards = [
+            [
+                pygame.Rect(
+                    tableau_x + step * nr,
+                    tableau_y + self.space_tableau * index,
+                    card_width,
+                    card_height,
+                )
+                for index in range(max_tableau_cards)
+            ]
+            for nr in range(7)
+        ]
+
+        # the piles
+        self.stock_rect = pygame.Rect(self.stock_position, (card_width, card_height))
+        self.show_rect = pygame.Rect(
+            show_x, show_y, card_width + 2 * self.space_show, card_height
+        )
+        self.foundation_rect = self.foundation_cards[0].union(self.foundation_cards[3])
+        # as low as the longest column goes
+        self.tableau_rects = [
+            column[0].union(column[-1]) for column in self.tableau_cards
+        ]
+
+        # buttons and counters on the right side
+        button_x = round(900 * scale)
+        self.button_width, self.button_height = round(100 * scale), round(40 * scale)
+        self.reset_button_rect = pygame.Rect(
+            button_x, round(120 * scale), self.button_width, self.button_height
+        )
+        self.rules_button_rect = pygame.Rect(
+            button_x, round(170 * scale), self.button_width, self.button_height
+        )
+        self.mode_button_rect = pygame.Rect(
+            button_x, round(220 * scale), self.button_width, self.button_height
+        )
+        self.buttons_rect = self.reset_button_rect.union(self.mode_button_rect)
+        self.counters_rect = pygame.Rect(
+            button_x, 0, self.button_width, round(100 * scale)
+        )
+
+        # what a click or a region to draw again can meet
+        self.regions = HitGrid(
+            [(("stock", 0), self.stock_rect), (("show", 0), self.show_rect)]
+            + [
+                (("foundation", nr), rect)
+                for nr, rect in enumerate(self.foundation_cards)
+            ]
+            + [(("tableau", nr), rect) for nr, rect in enumerate(self.tableau_rects)]
+            + [
+                (("button", "reset"), self.reset_button_rect),
+                (("button", "rules"), self.rules_button_rect),
+                (("button", "mode"), self.mode_button_rect),
+                (("counters", 0), self.counters_rect),
+            ],
+            (step, card_height),
+        )
+
+        # where dropped cards go, by the middle of the card: the foundation piles and
+        # the columns with the space on their right
+        self.drops = HitGrid(
+            [
+                (("foundation", nr), (rect.x, rect.y, step, card_height))
+                for nr, rect in enumerate(self.foundation_cards)
+            ]
+            + [
+                (
+                    ("tableau", nr),
+                    (
+                        rect.x,
+                        tableau_y,
+                        step,
+                        self.space_tableau * (max_tableau_cards + drop_rows + 1),
+                    ),
+                )
+                for nr, rect in enumerate(self.tableau_rects)
+            ],
+            (step, card_height),
+        )
+
+    def card_rect(self, location, nr, index, count=1):
+        """
+        Get the rectangle of cards of a pile.
+
+        Args:
+            self: refer to the current instance
+            location: "stock", "show", "foundation" or "tableau"
+            nr: index of the foundation or tableau pile
+            index: index of the first card in the pile (in the show pile for "show")
+            count: number of cards from it (a tableau run)
+
+        Returns:
+            The rectangle of the cards (a new one, it can be changed).
+        """
+        if location == "stock":
+            return pygame.Rect(self.stock_rect)
+        if location == "show":
+            return pygame.Rect(self.show_cards[index])
+        if location == "foundation":
+            return pygame.Rect(self.foundation_cards[nr])
+        rect = pygame.Rect(self.tableau_cards[nr][0])
+        rect.y += self.space_tableau * index
+        rect.height += self.space_tableau * (count - 1)
+        return rect
+
+    def column_rect(self, nr_tableau, nr_cards):
+        """
+        Get the rectangle covered by a tableau pile.
+
+        Args:
+            self: refer to the current instance
+            nr_tableau: tableau index
+            nr_cards: number of cards in it (it is at least one card high)
+
+        Returns:
+            The rectangle of the tableau pile.
+        """
+        return self.card_rect("tableau", nr_tableau, 0, max(nr_cards, 1))
+
+    def card_at(self, point, state):
+        """
+        Get the card that can be picked at a point: the top card of the show pile or
+        of a foundation pile, or a face up card of the tableau (the cards below it
+        come with it).
+
+        Args:
+            self: refer to the current instance
+            point: (x, y) on the screen
+            state: the GameState
+
+        Returns:
+            (location, nr, index of the card in the pile, in the show pile for
+            "show"), None if no card can be picked there.
+        """
+        region = self.regions.at(point)
+        if region is None:
+            return None
+        location, nr = region
+        if location == "show":
+            index = state.show_count - 1
+            if index >= 0 and self.show_cards[index].collidepoint(point):
+                return location, nr, index
+        elif location == "foundation":
+            if state.foundation[nr]:
+                return location, nr, len(state.foundation[nr]) - 1
+        elif location == "tableau":
+            column = state.tableau[nr]
+            index = (point[1] - self.tableau_position[1]) // self.space_tableau
+            if column and index >= len(column) - 1:
+                # the last card shows whole
+                if self.tableau_cards[nr][len(column) - 1].collidepoint(point):
+                    return location, nr, len(column) - 1
+            elif column and state.face_up(nr, index):
+                return location, nr, index
+        return None
+
+    def drop_target(self, point, state):
+        """
+        Get the pile cards are dropped on, from the middle of the card moved: a
+        foundation pile, or a column when the card is at most drop_rows card spaces
+        below its last card.
+
+        Args:
+            self: refer to the current instance
+            point: (x, y) of the middle of the card moved
+            state: the GameState
+
+        Returns:
+            (location, nr) of the pile, None if the card is not on one.
+        """
+        target = self.drops.at(point)
+        if target is None or target[0] == "foundation":
+            return target
+        row = (point[1] - self.tableau_position[1]) // self.space_tableau
+        length = len(state.tableau[target[1]])
+        if length <= row <= length + drop_rows:
+            return target
+        return None
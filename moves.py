@@ -0,0 +1,424 @@
+import time
+
+from engine import card_number, card_red, draw_move, tableau_fits
+
+# The piles cards are moved between, as (location, nr)
+move_piles = (
+    [("show", 0)]
+    + [("foundation", nr) for nr in range(4)]
+    + [("tableau", nr) for nr in range(7)]
+)
+
+
+def pair_moves(state, source, destination):
+    """
+    Get the legal moves from one pile to another.
+
+    Args:
+        state: the GameState
+        source: (location, nr) of the pile the cards are taken from
+        destination: (location, nr) of the pile they go on
+
+    Returns:
+        The list of moves.
+    """
+    location, nr = source
+    to_location, to_nr = destination
+    if source == destination or to_location == "show":
+        return []
+
+    if location == "tableau":
+        pile = state.tableau[nr]
+        if not pile:
+            return []
+        if to_location == "foundation":
+            if state.place_card_foundation(pile[-1], to_nr):
+                return [(location, nr, 1, to_location, to_nr)]
+            return []
+
+        # the face up cards are a run going down by one, so only one card of it can
+        # go on the top of the destination: the one a rank below that top
+        first = state.hidden[nr]
+        target = state.tableau[to_nr]
+        if target:
+            index = first + card_number[pile[first]] - card_number[target[-1]] + 1
+        else:
+            index = first + card_number[pile[first]] - 13
+        if first <= index < len(pile) and state.place_card_tableau(pile[index], to_nr):
+            return [(location, nr, len(pile) - index, to_location, to_nr)]
+        return []
+
+    if location == "show":
+        if not state.show_count:
+            return []
+        card = state.show_top()
+    else:
+        # foundation cards only go back to the tableau
+        if to_location != "tableau" or not state.foundation[nr]:
+            return []
+        card = state.foundation[nr][-1]
+
+    if to_location == "foundation":
+        fits = state.place_card_foundation(card, to_nr)
+    else:
+        fits = state.place_card_tableau(card, to_nr)
+    return [(location, nr, 1, to_location, to_nr)] if fits else []
+
+
+def all_moves(state):
+    """
+    Get every legal move of a position, computed from scratch (the same moves, in
+    the same order, as pair_moves over every pair of piles, looking up what each pile
+    takes instead of trying every pair).
+
+    Args:
+        state: the GameState
+
+    Returns:
+        The list of moves (the stock draw first, when there is something to draw).
+    """
+    moves = [draw_move] if state.can_draw() else []
+    foundation = state.foundation
+    tableau = state.tableau
+
+    # the card each foundation pile takes next (aces go on any empty pile)
+    wanted = {}
+    empty_foundations = []
+    for nr_foundation, pile in enumerate(foundation):
+        if not pile:
+            empty_foundations.append(nr_foundation)
+        elif pile[-1] < 48:
+            wanted[pile[-1] + 4] = nr_foundation
+    tops = [column[-1] if column else None for column in tableau]
+
+    def single_card(location, nr, card, to_foundation):
+        if to_foundation:
+            if card in wanted:
+                moves.append((location, nr, 1, "foundation", wanted[card]))
+            elif card < 4:
+                for nr_foundation in empty_foundations:
+                    moves.append((location, nr, 1, "foundation", nr_foundation))
+        for to_nr, top in enumerate(tops):
+            if tableau_fits[card][top] if top is not None else card >= 48:
+                moves.append((location, nr, 1, "tableau", to_nr))
+
+    if state.show_count:
+        single_card("show", 0, state.show_top(), True)
+    for nr_foundation, pile in enumerate(foundation):
+        if pile:
+            single_card("foundation", nr_foundation, pile[-1], False)
+
+    for nr_tableau, column in enumerate(tableau):
+        if not column:
+            continue
+        card = column[-1]
+        if card in wanted:
+            moves.append(("tableau", nr_tableau, 1, "foundation", wanted[card]))
+        elif card < 4:
+            for nr_foundation in empty_foundations:
+                moves.append(("tableau", nr_tableau, 1, "foundation", nr_foundation))
+
+        # the face up cards are a run, see pair_moves
+        first = state.hidden[nr_tableau]
+        first_number = card_number[column[first]]
+        for to_nr, top in enumerate(tops):
+            if to_nr == nr_tableau:
+                continue
+            if top is not None:
+                index = first + first_number - card_number[top] + 1
+            else:
+                index = first + first_number - 13
+            if first <= index < len(column) and (
+                tableau_fits[column[index]][top] if top is not None else index == first
+            ):
+                moves.append(
+                    ("tableau", nr_tableau, len(column) - index, "tableau", to_nr)
+                )
+    return moves
+
+
+def move_score(state, move):
+    """
+    Rate how good a move looks, without looking ahead: cards to the foundation and
+    moves that turn a face down card come first, moves that only shuffle cards around
+    last.
+
+    Args:
+        state: the GameState before the move
+        move: the move
+
+    Returns:
+        The score (higher is better, below 0 for moves that undo progress).
+    """
+    location, nr, count, to_location, to_nr = move
+    if location == "stock":
+        return 0
+
+    score = 0
+    if location == "tableau":
+        pile = state.tableau[nr]
+        first = len(pile) - count
+        hidden = state.hidden[nr]
+        if first == hidden and hidden:
+            # turns a card, better in columns with more face down cards
+            score += 50 + hidden
+        elif first == 0 and to_location == "tableau" and not state.tableau[to_nr]:
+            # a king already at the bottom of a column
+            return -100
+        elif first == 0:
+            # empties a column
+            score += 20
+        elif to_location == "tableau":
+            # splits a run without turning a card
+            return -50
+    elif location == "foundation":
+        return -10
+    elif location == "show":
+        score += 30
+
+    if to_location == "foundation":
+        card = state.pile(location, nr)[-1]
+        score += 60 - card_number[card]
+    return score
+
+
+def safe_foundation_move(state):
+    """
+    Find a move to the foundation that can never be a mistake: the card is an ace
+    or a two, or both cards of the other colour it could take in the tableau are
+    already in the foundation.
+
+    Args:
+        state: the GameState
+
+    Returns:
+        The move, None if there is none.
+    """
+    # the lowest number on top of the two foundation piles of each colour (0 while
+    # one of them is empty), indexed by card_red
+    lowest = [13, 13]
+    piles = [0, 0]
+    for pile in state.foundation:
+        if pile:
+            red = card_red[pile[-1]]
+            piles[red] += 1
+            lowest[red] = min(lowest[red], card_number[pile[-1]])
+    for red in (0, 1):
+        if piles[red] < 2:
+            lowest[red] = 0
+
+    cards = [("show", 0, state.show_top())] if state.show_count else []
+    cards += [
+        ("tableau", nr_tableau, column[-1])
+        for nr_tableau, column in enumerate(state.tableau)
+        if column
+    ]
+    for location, nr, card in cards:
+        number = card_number[card]
+        if number > 2 and lowest[not card_red[card]] < number - 1:
+            continue
+        for nr_foundation in range(4):
+            if state.place_card_foundation(card, nr_foundation):
+                return (location, nr, 1, "foundation", nr_foundation)
+    return None
+
+
+def can_auto_complete(state):
+    """
+    Verifies if a game can be finished without the player: the stock and the waste
+    are empty and every card of the tableau is face up.
+
+    Args:
+        state: the GameState
+
+    Returns:
+        True/False if auto_complete_moves() wins the game
+    """
+    return not state.can_draw() and not any(state.hidden)
+
+
+def auto_complete_moves(state):
+    """
+    Get the moves that put every card of the tableau in the foundation, for a game
+    that can be auto-completed (see can_auto_complete). Every column is a run, so its
+    last card is its lowest: the columns are emptied as far as they go, one after the
+    other, until no card is left. The state is not changed.
+
+    Args:
+        state: the GameState
+
+    Returns:
+        The list of moves, in the order they are made.
+    """
+    # the card each foundation pile takes next, and the empty piles for the aces
+    wanted = {}
+    empty_foundations = []
+    for nr_foundation, pile in enumerate(state.foundation):
+        if not pile:
+            empty_foundations.append(nr_foundation)
+        elif pile[-1] < 48:
+            wanted[pile[-1] + 4] = nr_foundation
+
+    lengths = [len(column) for column in state.tableau]
+    finish = []
+    placed = True
+    while placed:
+        placed = False
+        for nr_tableau, column in enumerate(state.tableau):
+            length = lengths[nr_tableau]
+            while length:
+                card = column[length - 1]
+                if card in wanted:
+                    nr_foundation = wanted.pop(card)
+                elif card < 4 and empty_foundations:
+                    nr_foundation = empty_foundations.pop(0)
+                else:
+                    break
+                finish.append(("tableau", nr_tableau, 1, "foundation", nr_foundation))
+                if card < 48:
+                    wanted[card + 4] = nr_foundation
+                length -= 1
+                placed = True
+            lengths[nr_tableau] = length
+    return finish
+
+
+class MoveGenerator:
+    """
+    The class MoveGenerator keeps the legal moves of a game up to date. The moves are
+    kept per (source pile, destination pile) pair; after a move only the pairs with
+    one of the two piles it changed are computed again.
+    """
+
+    def __init__(self, state):
+        """
+        MoveGenerator constructor
+
+        Args:
+            self: refer to the current instance
+            state: the GameState the moves are generated for
+
+        Returns:
+            None
+        """
+        self.state = state
+        self.pairs = {}
+        self.changed = set(move_piles)
+        self.cached = None
+        self.computed_pairs = 0
+
+    def touch(self, move):
+        """
+        Mark the piles changed by a move (after it was made on the state).
+
+        Args:
+            self: refer to the current instance
+            move: the move that was made
+
+        Returns:
+            None
+        """
+        location, nr, count, to_location, to_nr = move
+        if location == "stock":
+            self.changed.add(("show", 0))
+        else:
+            self.changed.add((location, nr))
+            self.changed.add((to_location, to_nr))
+        self.cached = None
+
+    def reset(self):
+        """
+        Compute every move again (e.g. after the state was changed from outside).
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        self.changed = set(move_piles)
+        self.cached = None
+
+    def apply(self, move):
+        """
+        Make a move on the state if it follows the rules.
+
+        Args:
+            self: refer to the current instance
+            move: (source, source_nr, count, destination, destination_nr)
+
+        Returns:
+            True/False if the move was made
+        """
+        if not self.state.apply(move):
+            return False
+        self.touch(move)
+        return True
+
+    def moves(self):
+        """
+        Get every legal move of the current position.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The list of moves (the stock draw first, when there is something to draw).
+        """
+        if self.cached is not None:
+            return self.cached
+
+        state = self.state
+        for source in move_piles:
+            for destination in move_piles:
+                if source in self.changed or destination in self.changed:
+                    self.pairs[source, destination] = pair_moves(
+                        state, source, destination
+                    )
+                    self.computed_pairs += 1
+        self.changed = set()
+
+        moves = [draw_move] if state.can_draw() else []
+        for pair in self.pairs.values():
+            moves += pair
+        self.cached = moves
+        return moves
+
+    def best(self, budget=0.008):
+        """
+        Find the move to suggest as a hint. The moves are rated with move_score; while
+        the time budget lasts, the best rated ones are tried and rated again by the
+        moves they open to the foundation and to face down cards.
+
+        Args:
+            self: refer to the current instance
+            budget: seconds that can be spent (a part of a frame)
+
+        Returns:
+            The suggested move, None if there is nothing useful to do.
+        """
+        deadline = time.perf_counter() + budget
+        state = self.state
+        rated = sorted(
+            ((move_score(state, move), move) for move in self.moves()),
+            key=lambda item: item[0],
+            reverse=True,
+        )
+        rated = [(score, move) for score, move in rated if score >= 0]
+        if not rated:
+            return None
+
+        best_score, best_move = rated[0]
+        best_score *= 2
+        for score, move in rated:
+            if time.perf_counter() > deadline:
+                break
+            after = state.copy()
+            after.apply(move)
+            follow_up = max(
+                (move_score(after, next_move) for next_move in all_moves(after)),
+                default=0,
+            )
+            if 2 * score + max(follow_up, 0) > best_score:
+                best_score, best_move = 2 * score + max(follow_up, 0), move
+        return best_move
@@ -0,0 +1,543 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pygame
+
+
+class BoardLayer:
+    """
+    The class BoardLayer keeps the static background of the board (the green felt,
+    the rectangles on which the piles are placed and the button frames) pre-rendered,
+    once per window size, so any region of the screen can be restored with one blit.
+    """
+
+    def __init__(self, background_color, slot_color, button_color):
+        """
+        BoardLayer constructor
+
+        Args:
+            self: refer to the current instance
+            background_color: color of the felt
+            slot_color: color of the pile rectangles (RGB or RGBA)
+            button_color: color of the button frames
+
+        Returns:
+            None
+        """
+        self.background_color = background_color
+        self.slot_color = slot_color
+        self.button_color = button_color
+        self.slot_rects = []
+        self.button_rects = []
+        self.layer = None
+        self.renders = 0
+
+    def set_layout(self, slot_rects, button_rects):
+        """
+        Set the rectangles of the piles and of the buttons. The layer is rendered again
+        on its next use.
+
+        Args:
+            self: refer to the current instance
+            slot_rects: rectangles on which the piles are placed
+            button_rects: rectangles of the buttons
+
+        Returns:
+            None
+        """
+        self.slot_rects = [pygame.Rect(rect) for rect in slot_rects]
+        self.button_rects = [pygame.Rect(rect) for rect in button_rects]
+        self.layer = None
+
+    def render(self, size):
+        """
+        Render the background for a window size.
+
+        Args:
+            self: refer to the current instance
+            size: (width, height) of the window
+
+        Returns:
+            The rendered layer.
+        """
+        layer = pygame.Surface(size)
+        if pygame.display.get_surface():
+            layer = layer.convert()
+        layer.fill(self.background_color)
+
+        # one transparent surface for all the pile rectangles
+        slots = pygame.Surface(size, pygame.SRCALPHA)
+        for rect in self.slot_rects:
+            pygame.draw.rect(slots, self.slot_color, rect)
+        layer.blit(slots, (0, 0))
+
+        for rect in self.button_rects:
+            pygame.draw.rect(layer, self.button_color, rect)
+
+        self.renders += 1
+        return layer
+
+    def get(self, size):
+        """
+        Get the background for a window size, rendering it only if the size changed.
+
+        Args:
+            self: refer to the current instance
+            size: (width, height) of the window
+
+        Returns:
+            The rendered layer.
+        """
+        if self.layer is None or self.layer.get_size() != tuple(size):
+            self.layer = self.render(size)
+        return self.layer
+
+    def restore(self, screen, rect=None):
+        """
+        Restore a region of the screen (or the whole screen) from the background.
+
+        Args:
+            self: refer to the current instance
+            screen: pygame screen
+            rect: the region to restore, None for the whole screen
+
+        Returns:
+            None
+        """
+        layer = self.get(screen.get_size())
+        if rect is None:
+            screen.blit(layer, (0, 0))
+        else:
+            rect = pygame.Rect(rect)
+            screen.blit(layer, rect, area=rect)
+
+
+class TextCache:
+    """
+    The class TextCache keeps rendered text, keyed by (font, size, text, color),
+    so that labels are rasterised only once. The least recently used texts are
+    dropped when the cache is full. Numbers are drawn from cached digit glyphs.
+    """
+
+    def __init__(self, max_entries=256):
+        """
+        TextCache constructor
+
+        Args:
+            self: refer to the current instance
+            max_entries: how many rendered texts are kept
+
+        Returns:
+            None
+        """
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.texts = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def font(self, size, name=None):
+        """
+        Get a font, creating it only the first time.
+
+        Args:
+            self: refer to the current instance
+            size: size of the font
+            name: font file (None for the default pygame font)
+
+        Returns:
+            The pygame font.
+        """
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = pygame.font.Font(name, size)
+            self.fonts[(name, size)] = font
+        return font
+
+    def render(self, text, size, color, name=None):
+        """
+        Get the rendered surface of a text, rendering it only on the first use.
+
+        Args:
+            self: refer to the current instance
+            text: the text
+            size: size of the font
+            color: color of the text
+            name: font file (None for the default pygame font)
+
+        Returns:
+            The surface with the text.
+        """
+        key = (name, size, text, tuple(color))
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.texts.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size, name).render(text, True, color)
+        self.texts[key] = surface
+        if len(self.texts) > self.max_entries:
+            self.texts.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def preload(self, texts, size, color, name=None):
+        """
+        Render several texts in advance (static labels).
+
+        Args:
+            self: refer to the current instance
+            texts: list of texts
+            size: size of the font
+            color: color of the texts
+            name: font file (None for the default pygame font)
+
+        Returns:
+            None
+        """
+        for text in texts:
+            self.render(text, size, color, name)
+
+    def draw_number(self, screen, position, label, number, size, color, name=None):
+        """
+        Draw a label followed by a number, composed from the cached label and digits,
+        so that a changing counter never renders new text.
+
+        Args:
+            self: refer to the current instance
+            screen: pygame screen
+            position: (x, y) where the text begins
+            label: the text in front of the number (e.g. "FPS: ")
+            number: the number
+            size: size of the font
+            color: color of the text
+            name: font file (None for the default pygame font)
+
+        Returns:
+            The rectangle covered by the text.
+        """
+        x, y = position
+        area = pygame.Rect(x, y, 0, 0)
+        for text in [label] + list(str(number)):
+            glyph = self.render(text, size, color, name)
+            area.union_ip(screen.blit(glyph, (x, y)))
+            x += glyph.get_width()
+        return area
+
+    def stats(self):
+        """
+        Get the statistics of the cache.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            A dictionary with the hits, misses, evictions and number of texts and fonts.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "texts": len(self.texts),
+            "fonts": len(self.fonts),
+        }
+
+
+class RulesOverlay:
+    """
+    The class RulesOverlay keeps the rules text rendered on an off-screen surface.
+    The file is read by a background thread, only when its modification time
+    changes, so showing the rules never touches the disk; the surface is rendered
+    again only when the text or the window size changed. It also keeps a snapshot of
+    the board under the overlay, so hiding the rules is a single blit.
+    """
+
+    def __init__(
+        self,
+        filename,
+        background_color,
+        text_color,
+        text_cache,
+        font_size=30,
+        poll_interval=1.0,
+    ):
+        """
+        RulesOverlay constructor
+
+        Args:
+            self: refer to the current instance
+            filename: name of the txt file with the rules
+            background_color: color behind the text
+            text_color: color of the text
+            text_cache: TextCache that provides the font
+            font_size: size of the font
+            poll_interval: seconds between two checks of the file
+
+        Returns:
+            None
+        """
+        self.filename = filename
+        self.background_color = background_color
+        self.text_color = text_color
+        self.text_cache = text_cache
+        self.font_size = font_size
+        self.poll_interval = poll_interval
+        # (lines, version), replaced as a whole by the watcher thread
+        self.text = ([], 0)
+        self.mtime = None
+        self.overlay = None
+        self.overlay_key = None
+        self.snapshot = None
+        self.snapshot_rect = None
+        self.renders = 0
+
+        self.read_file()
+        self.stop_event = threading.Event()
+        self.watcher = threading.Thread(target=self.watch_file, daemon=True)
+        self.watcher.start()
+
+    def read_file(self):
+        """
+        Read the rules again if the file changed since the last read (only the
+        watcher thread calls it, once it is started).
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        try:
+            mtime = os.stat(self.filename).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        lines, version = self.text
+        if mtime == self.mtime and version > 0:
+            return
+
+        lines = []
+        if mtime is None:
+            print(f"File not found: {self.filename}")
+        else:
+            try:
+                with open(self.filename, "r") as file:
+                    lines = file.read().splitlines()
+            except FileNotFoundError:
+                # removed between the check and the read, seen on the next check
+                return
+
+        self.mtime = mtime
+        self.text = (lines, version + 1)
+
+    def watch_file(self):
+        """
+        Check the file every poll_interval seconds until close() is called (runs on
+        the watcher thread).
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        while not self.stop_event.wait(self.poll_interval):
+            self.read_file()
+
+    def close(self):
+        """
+        Stop the watcher thread.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        self.stop_event.set()
+        self.watcher.join()
+
+    def get(self, size):
+        """
+        Get the rendered rules, rendering them only if the text, the size or the font
+        size changed.
+
+        Args:
+            self: refer to the current instance
+            size: (width, height) of the overlay
+
+        Returns:
+            The surface with the rules.
+        """
+        lines, version = self.text
+        key = (tuple(size), version, self.font_size)
+        if self.overlay is None or self.overlay_key != key:
+            self.overlay_key = key
+            self.overlay = self.render(size, lines)
+        return self.overlay
+
+    def render(self, size, lines):
+        """
+        Render the rules on a new surface.
+
+        Args:
+            self: refer to the current instance
+            size: (width, height) of the overlay
+            lines: lines of the rules text
+
+        Returns:
+            The surface with the rules.
+        """
+        overlay = pygame.Surface(size)
+        if pygame.display.get_surface():
+            overlay = overlay.convert()
+        overlay.fill(self.background_color)
+        font = self.text_cache.font(self.font_size)
+
+        # Render each line separately
+        margin = round(self.font_size * 5 / 3)  # 50 pixels for the 30 font
+        y_offset = margin
+        for line in lines:
+            text = font.render(line, True, self.text_color)
+            overlay.blit(text, (margin, y_offset))
+            y_offset += text.get_height() + 5
+
+        self.renders += 1
+        return overlay
+
+    def show(self, screen, rect):
+        """
+        Keep a snapshot of the board under rect and draw the rules over it.
+
+        Args:
+            self: refer to the current instance
+            screen: pygame screen
+            rect: region of the screen covered by the rules
+
+        Returns:
+            None
+        """
+        rect = pygame.Rect(rect).clip(screen.get_rect())
+        self.snapshot = screen.subsurface(rect).copy()
+        self.snapshot_rect = rect
+        screen.blit(self.get(rect.size), rect)
+
+    def hide(self, screen):
+        """
+        Put back the board snapshot taken when the rules were shown.
+
+        Args:
+            self: refer to the current instance
+            screen: pygame screen
+
+        Returns:
+            The region of the screen that was restored (None if there is no snapshot).
+        """
+        if self.snapshot is None:
+            return None
+        screen.blit(self.snapshot, self.snapshot_rect)
+        rect = self.snapshot_rect
+        self.snapshot = None
+        self.snapshot_rect = None
+        return rect
+
+
+class DragLayer:
+    """
+    The class DragLayer is used while cards are dragged: it keeps a snapshot of the
+    board without the lifted cards and the lifted cards composed on one surface, so
+    each frame of the drag is one blit to restore the board and one for the cards.
+    """
+
+    def __init__(self):
+        """
+        DragLayer constructor
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        self.snapshot = None
+        self.cards = None
+
+    def active(self):
+        """
+        Verifies if cards are being dragged.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            True/False if a drag is in progress
+        """
+        return self.cards is not None
+
+    def begin(self, screen, images, card_size, spacing):
+        """
+        Start a drag: snapshot the screen (already drawn without the lifted cards)
+        and compose the lifted cards on one surface.
+
+        Args:
+            self: refer to the current instance
+            screen: pygame screen
+            images: the surfaces of the lifted cards, from top to bottom
+            card_size: (width, height) of a card
+            spacing: vertical space between two cards of the run
+
+        Returns:
+            None
+        """
+        self.snapshot = screen.copy()
+
+        width, height = card_size
+        self.cards = pygame.Surface((width, height + spacing * (len(images) - 1)))
+        if pygame.display.get_surface():
+            self.cards = self.cards.convert()
+        for index, image in enumerate(images):
+            self.cards.blit(image, (0, spacing * index))
+
+    def restore(self, screen, rect):
+        """
+        Restore a region of the board from the snapshot.
+
+        Args:
+            self: refer to the current instance
+            screen: pygame screen
+            rect: the region to restore
+
+        Returns:
+            None
+        """
+        screen.blit(self.snapshot, rect, area=rect)
+
+    def draw(self, screen, position):
+        """
+        Draw the dragged cards.
+
+        Args:
+            self: refer to the current instance
+            screen: pygame screen
+            position: (x, y) of the top left corner of the first card
+
+        Returns:
+            The rectangle covered by the dragged cards.
+        """
+        return screen.blit(self.cards, position)
+
+    def end(self):
+        """
+        Stop the drag and release the surfaces.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        self.snapshot = None
+        self.cards = None
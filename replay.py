@@ -0,0 +1,463 @@
+import argparse
+import os
+import struct
+import time
+
+import engine
+import savegame
+
+# default location, relative to the game folder: one replay per run of the game
+base_directory = os.path.dirname(os.path.abspath(__file__))
+replays_directory = os.path.join(base_directory, "replays")
+# the oldest replays are removed when a new one is started
+max_replays = 100
+
+# Replay format: the magic and version, then one record per action of the player,
+# each a tag, the time since the previous record and the data of the tag:
+#   deal: a new deal (the reason, the draw count and the seed)
+#   snapshot: the game resumed from a save (the save bytes, see savegame.py)
+#   move: a move made (source and destination pile as in engine.log_piles, count)
+#   undo, redo: a move taken back or made again
+# A move takes 5 bytes. Records are written one at a time, so a crash loses at most
+# the action in progress.
+replay_magic = b"SOLREPLY"
+replay_version = 1
+replay_header = struct.Struct("<8sH")
+# tag, hundredths of a second since the previous record
+record_header = struct.Struct("<cH")
+deal_record = struct.Struct("<BBI")
+move_record = struct.Struct("<BB")
+deal_reasons = ["start", "reset", "mode"]
+
+
+class ReplayRecorder:
+    """
+    The class ReplayRecorder writes the replay of the games played, record after
+    record, as they are played. When the file can not be created or written (a
+    read-only folder, a full disk) the recording stops and the game goes on.
+    """
+
+    def __init__(self, path):
+        """
+        ReplayRecorder constructor (the file is created, the oldest replays of its
+        folder are removed)
+
+        Args:
+            self: refer to the current instance
+            path: the replay file
+
+        Returns:
+            None
+        """
+        self.path = path
+        self.file = None
+        self.last_time = time.perf_counter()
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            prune_replays(directory, max_replays - 1)
+            self.file = open(path, "wb")
+            self.file.write(replay_header.pack(replay_magic, replay_version))
+            self.file.flush()
+        except OSError as error:
+            self.stop(error)
+
+    def stop(self, error):
+        """
+        Stop recording after an error of the file.
+
+        Args:
+            self: refer to the current instance
+            error: the OSError
+
+        Returns:
+            None
+        """
+        print(f"the games are not recorded any more: {error}")
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                pass
+        self.file = None
+
+    def write(self, tag, data=b""):
+        """
+        Write a record and send it to the file at once (nothing once the recording
+        stopped).
+
+        Args:
+            self: refer to the current instance
+            tag: the tag of the record (one byte)
+            data: the data of the record
+
+        Returns:
+            None
+        """
+        if self.file is None:
+            return
+        now = time.perf_counter()
+        delay = min(round((now - self.last_time) * 100), 65535)
+        self.last_time = now
+        try:
+            self.file.write(record_header.pack(tag, delay) + data)
+            self.file.flush()
+        except OSError as error:
+            self.stop(error)
+
+    def deal(self, seed, draw_count, reason):
+        """
+        Record a new deal.
+
+        Args:
+            self: refer to the current instance
+            seed: the seed of the deal
+            draw_count: cards drawn from the stock at a time (1 or 3)
+            reason: "start", "reset" or "mode"
+
+        Returns:
+            None
+        """
+        self.write(b"D", deal_record.pack(deal_reasons.index(reason), draw_count, seed))
+
+    def snapshot(self, state, seed):
+        """
+        Record a game that does not start from its deal (resumed from a save).
+
+        Args:
+            self: refer to the current instance
+            state: the GameState
+            seed: the seed of the deal
+
+        Returns:
+            None
+        """
+        data = savegame.pack_game(state, seed)
+        self.write(b"S", bytes((len(data),)) + data)
+
+    def move(self, move):
+        """
+        Record a move (made, so it followed the rules).
+
+        Args:
+            self: refer to the current instance
+            move: (source, source_nr, count, destination, destination_nr)
+
+        Returns:
+            None
+        """
+        source, source_nr, count, destination, destination_nr = move
+        self.write(
+            b"M",
+            move_record.pack(
+                engine.log_pile_codes[source, source_nr] << 4
+                | engine.log_pile_codes[destination, destination_nr],
+                count,
+            ),
+        )
+
+    def undo(self):
+        """
+        Record an undo.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        self.write(b"U")
+
+    def redo(self):
+        """
+        Record a redo.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        self.write(b"R")
+
+    def close(self):
+        """
+        Close the replay file.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            None
+        """
+        if self.file is None:
+            return
+        try:
+            self.file.close()
+        except OSError as error:
+            print(f"the replay could not be closed: {error}")
+        self.file = None
+
+
+def new_replay_path(directory=replays_directory):
+    """
+    Get a new replay file name, from the time the game started.
+
+    Args:
+        directory: folder of the replays
+
+    Returns:
+        The path of the replay file.
+    """
+    name = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(directory, f"{name}.rpl")
+    number = 1
+    while os.path.exists(path):
+        number += 1
+        path = os.path.join(directory, f"{name}-{number}.rpl")
+    return path
+
+
+def prune_replays(directory=replays_directory, keep=max_replays):
+    """
+    Remove the oldest replays of a folder, so it does not grow without limit.
+
+    Args:
+        directory: folder of the replays
+        keep: how many of the newest replays are kept
+
+    Returns:
+        The number of replays removed.
+    """
+    paths = [
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(".rpl")
+    ]
+    paths.sort(key=os.path.getmtime)
+    removed = 0
+    for path in paths[: max(len(paths) - keep, 0)]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            # left for the next start
+            pass
+    return removed
+
+
+def read_replay(path):
+    """
+    Read the records of a replay. A last record cut by a crash is left out.
+
+    Args:
+        path: the replay file
+
+    Returns:
+        The list of records: (tag, delay in seconds, data), data being
+        (reason, draw_count, seed) for a deal, (GameState, seed) for a snapshot, the
+        move for a move and None for undo and redo.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < replay_header.size:
+        raise ValueError(f"{path} is not a replay")
+    magic, version = replay_header.unpack_from(data)
+    if magic != replay_magic or version != replay_version:
+        raise ValueError(f"{path} is not a replay")
+
+    records = []
+    offset = replay_header.size
+    while offset + record_header.size <= len(data):
+        tag, delay = record_header.unpack_from(data, offset)
+        offset += record_header.size
+        if tag == b"D":
+            if offset + deal_record.size > len(data):
+                break
+            reason, draw_count, seed = deal_record.unpack_from(data, offset)
+            offset += deal_record.size
+            record = (deal_reasons[reason], draw_count, seed)
+        elif tag == b"S":
+            if offset >= len(data) or offset + 1 + data[offset] > len(data):
+                break
+            length = data[offset]
+            record = savegame.unpack_game(data[offset + 1 : offset + 1 + length])
+            offset += 1 + length
+        elif tag == b"M":
+            if offset + move_record.size > len(data):
+                break
+            piles, count = move_record.unpack_from(data, offset)
+            offset += move_record.size
+            source, source_nr = engine.log_piles[piles >> 4]
+            destination, destination_nr = engine.log_piles[piles & 15]
+            if source == "stock":
+                record = engine.draw_move
+            else:
+                record = (source, source_nr, count, destination, destination_nr)
+        elif tag in (b"U", b"R"):
+            record = None
+        else:
+            raise ValueError(f"{path}: unknown record {tag!r} at byte {offset}")
+        records.append((tag, delay / 100, record))
+    return records
+
+
+def check_cards(state):
+    """
+    Verify that a game holds each of the 52 cards once.
+
+    Args:
+        state: the GameState
+
+    Returns:
+        True/False if the cards are right
+    """
+    cards = state.stock_cards() + state.waste_cards()
+    for pile in state.foundation + state.tableau:
+        cards += pile
+    return sorted(cards) == list(range(52))
+
+
+def run_turbo(records):
+    """
+    Play the records of a replay with the rules of the game only (no window, no
+    drawing, no waiting), checking every step.
+
+    Args:
+        records: the records returned by read_replay()
+
+    Returns:
+        A dictionary with the number of deals, the moves played, the games won and
+        the list of errors (record number and description).
+    """
+    state = None
+    move_log = None
+    result = {"deals": 0, "moves": 0, "won": 0, "errors": []}
+    for number, (tag, delay, data) in enumerate(records):
+        if tag in (b"D", b"S"):
+            if tag == b"D":
+                reason, draw_count, seed = data
+                state = engine.seeded_game(seed, draw_count)
+            elif data is None:
+                result["errors"].append((number, "snapshot is not a valid game"))
+                return result
+            else:
+                state = data[0]
+            move_log = engine.MoveLog(state)
+            result["deals"] += 1
+            continue
+
+        if state is None:
+            result["errors"].append((number, "action before the first deal"))
+            return result
+        won = state.won()
+        if tag == b"M":
+            if not move_log.play(data):
+                result["errors"].append((number, f"illegal move {data}"))
+                return result
+            result["moves"] += 1
+        elif (move_log.undo() if tag == b"U" else move_log.redo()) is None:
+            result["errors"].append(
+                (number, f"nothing to {'undo' if tag == b'U' else 'redo'}")
+            )
+        if not check_cards(state):
+            result["errors"].append((number, "cards lost or duplicated"))
+            return result
+        if state.won() and not won:
+            result["won"] += 1
+    return result
+
+
+def play_in_window(records, speed=1.0, max_delay=2.0):
+    """
+    Play the records of a replay in the game window, at the speed they were played.
+
+    Args:
+        records: the records returned by read_replay()
+        speed: how many times faster than the player
+        max_delay: longest wait between two records, in seconds (before the speed)
+
+    Returns:
+        None
+    """
+    # imported here, the turbo mode runs without pygame
+    import pygame
+
+    import solitaire
+
+    solitaire.start_game()
+    for tag, delay, data in records:
+        deadline = time.perf_counter() + min(delay, max_delay) / speed
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+                if event.type == pygame.VIDEORESIZE:
+                    solitaire.handle_event(event)
+            solitaire.draw_frame()
+            pygame.display.update(solitaire.compositor.flush())
+            if time.perf_counter() >= deadline:
+                break
+            solitaire.clock.tick(60)
+
+        if tag == b"D":
+            reason, solitaire.game_mode, seed = data
+            solitaire.game_seed = seed
+            solitaire.set_state(engine.seeded_game(seed, solitaire.game_mode))
+            solitaire.draw_cards(solitaire.screen)
+        elif tag == b"S" and data is not None:
+            solitaire.set_state(data[0])
+            solitaire.game_mode, solitaire.game_seed = data[0].draw_count, data[1]
+            solitaire.draw_cards(solitaire.screen)
+        elif tag == b"M":
+            solitaire.replay_move(solitaire.screen, data)
+        elif tag in (b"U", b"R"):
+            solitaire.step_move(solitaire.screen, tag == b"R")
+
+    # keep the window open on the end of the replay
+    while not any(event.type == pygame.QUIT for event in pygame.event.get()):
+        solitaire.draw_frame()
+        pygame.display.update(solitaire.compositor.flush())
+        solitaire.clock.tick(30)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play recorded games again.")
+    parser.add_argument("replays", nargs="+", help="replay files")
+    parser.add_argument(
+        "--turbo",
+        action="store_true",
+        help="no window: play the rules only, as fast as possible, and check them",
+    )
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed")
+    args = parser.parse_args()
+
+    if not args.turbo:
+        for path in args.replays:
+            play_in_window(read_replay(path), args.speed)
+    else:
+        start = time.perf_counter()
+        moves = failed = 0
+        for path in args.replays:
+            try:
+                result = run_turbo(read_replay(path))
+            except (OSError, ValueError) as error:
+                print(f"{path}: {error}")
+                failed += 1
+                continue
+            moves += result["moves"]
+            status = "ok" if not result["errors"] else "FAILED"
+            failed += bool(result["errors"])
+            print(
+                f"{path}: {status}, {result['deals']} deals, {result['moves']} moves, "
+                f"{result['won']} won"
+            )
+            for number, error in result["errors"]:
+                print(f"    record {number}: {error}")
+
+        elapsed = time.perf_counter() - start
+        print(
+            f"{len(args.replays)} replays, {failed} failed, {moves} moves in "
+            f"{elapsed:.2f} s ({moves / max(elapsed, 1e-9):.0f} moves/s)"
+        )
+        raise SystemExit(1 if failed else 0)
@@ -0,0 +1,144 @@
+import os
+import struct
+
+import engine
+
+# default location, relative to the game folder
+base_directory = os.path.dirname(os.path.abspath(__file__))
+save_path = os.path.join(base_directory, "savegame.sav")
+
+# Save format: header, the number of cards of every pile (stock, waste, the 4
+# foundation piles, the 7 tableau piles), the number of face down cards of every
+# tableau pile, then every card as one byte (its code, see engine.py), pile after
+# pile. The stock is face down and every other card outside the face down part of
+# the tableau is face up, so that is all the face up flags there are.
+save_magic = b"SOLSAVE\x00"
+save_version = 1
+# magic, version, draw count, show count, seed, moves
+save_header = struct.Struct("<8sHBBII")
+save_piles = 13
+
+
+def pack_game(state, seed):
+    """
+    Encode a game in bytes (about a hundred).
+
+    Args:
+        state: the GameState
+        seed: the seed of the deal (0 if unknown)
+
+    Returns:
+        The bytes of the game.
+    """
+    # the stock is saved with the next card to draw last
+    piles = [state.stock_cards()[::-1], state.waste_cards()]
+    piles += state.foundation + state.tableau
+    return (
+        save_header.pack(
+            save_magic,
+            save_version,
+            state.draw_count,
+            state.show_count,
+            seed,
+            state.moves,
+        )
+        + bytes(len(pile) for pile in piles)
+        + bytes(state.hidden)
+        + b"".join(bytes(pile) for pile in piles)
+    )
+
+
+def unpack_game(data):
+    """
+    Decode a game saved by pack_game, straight into its piles (no deck is dealt).
+
+    Args:
+        data: the bytes of the game
+
+    Returns:
+        (GameState, seed), or None if the data is not a valid game.
+    """
+    start = save_header.size + save_piles + 7
+    if len(data) < start:
+        return None
+    magic, version, draw_count, show_count, seed, moves = save_header.unpack_from(data)
+    if magic != save_magic or version != save_version or draw_count not in (1, 3):
+        return None
+
+    lengths = data[save_header.size : save_header.size + save_piles]
+    hidden = list(data[save_header.size + save_piles : start])
+    cards = data[start:]
+    if len(cards) != sum(lengths) or sorted(cards) != list(range(52)):
+        return None
+
+    piles = []
+    for length in lengths:
+        piles.append(list(cards[:length]))
+        cards = cards[length:]
+
+    state = engine.GameState(draw_count)
+    state.set_stock(piles[0][::-1], piles[1], show_count)
+    state.foundation = piles[2:6]
+    state.tableau = piles[6:]
+    state.hidden = hidden
+    state.moves = moves
+    if show_count > min(draw_count, len(piles[1])) or any(
+        count > max(len(column) - 1, 0) for count, column in zip(hidden, state.tableau)
+    ):
+        return None
+    return state, seed
+
+
+def save(state, seed, path=save_path):
+    """
+    Save a game. The file is written next to the save and renamed over it, so a crash
+    while saving leaves the previous save whole.
+
+    Args:
+        state: the GameState
+        seed: the seed of the deal (0 if unknown)
+        path: the save file
+
+    Returns:
+        None
+    """
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(pack_game(state, seed))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def load(path=save_path):
+    """
+    Load the saved game.
+
+    Args:
+        path: the save file
+
+    Returns:
+        (GameState, seed), or None if there is no valid save.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    return unpack_game(data)
+
+
+def remove(path=save_path):
+    """
+    Delete the saved game (e.g. when it was won).
+
+    Args:
+        path: the save file
+
+    Returns:
+        None
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -1,1301 +1,1510 @@
-import pygame
-import sys
-import random
-import math
-
-
-class Card:
-    """
-    The class Card represents the game cards
-    It has different methods for dealing with the cards
-    """
-
-    def __init__(self, number, symbol):
-        """
-        Card constructor
-
-        Args:
-            self: refer to the current instance
-            number: number of the card (1,2,..,13)
-            symbol: symbol of card (hearts,diamons,clubs,spades)
-
-        Returns:
-            None
-        """
-        self.number = number
-        self.symbol = symbol
-        self.face_up = False
-
-    def flip(self):
-        """
-        Flips the card upwards or downwards depending of the original state.
-
-        Args:
-            self: refer to the current instance
-
-        Returns:
-            None
-        """
-        self.face_up = not self.face_up
-
-    def draw(self, screen, x, y):
-        """
-        Draw this instance of the card on the screen.
-
-        Args:
-            self: refer to the current instance
-            screen: the pygame screen
-            x: the x coordinate of the card on the screen where the card will begin drawing
-            y: the y coordinate of the card on the screen where the card will begin drawing
-
-        Returns:
-            None
-        """
-        card_image = pygame.image.load(
-            f"Proiect Python/cards/clasic/{str(self.number)}_of_{self.symbol}.png"
-        ).convert()
-        card_back = pygame.image.load(
-            "Proiect Python/cards/clasic/card_back.png"
-        ).convert()
-
-        # resize the card images
-        new_width, new_height = 100, 150
-        card_image = pygame.transform.scale(card_image, (new_width, new_height))
-        card_back = pygame.transform.scale(card_back, (new_width, new_height))
-
-        if self.face_up:
-            screen.blit(card_image, (x, y))
-        else:
-            screen.blit(card_back, (x, y))
-
-    def draw_top(self, screen, x, y):
-        """
-        Draw only the top size of the card. The first 30 pixels as height.
-
-        Args:
-            self: refer to the current instance
-            screen: the pygame screen
-            x: the x coordinate of the card on the screen where the card will begin drawing
-            y: the y coordinate of the card on the screen where the card will begin drawing
-
-        Returns:
-            None
-        """
-
-        card_image = pygame.image.load(
-            f"Proiect Python/cards/clasic/{str(self.number)}_of_{self.symbol}.png"
-        ).convert()
-        card_back = pygame.image.load(
-            "Proiect Python/cards/clasic/card_back.png"
-        ).convert()
-
-        # resize the card images
-        new_width, new_height = 100, 150
-        card_image = pygame.transform.scale(card_image, (new_width, new_height))
-        card_back = pygame.transform.scale(card_back, (new_width, new_height))
-
-        # draw only the top 30 pixels of the card (space_tableau dimension)
-        top_portion_rect = pygame.Rect(0, 0, new_width, 30)
-
-        if self.face_up:
-            screen.blit(card_image, (x, y), area=top_portion_rect)
-        else:
-            screen.blit(card_back, (x, y), area=top_portion_rect)
-
-    def get_rect_at(self, x, y):
-        """
-        Get a rectangle at the location provided by (x,y) where the card is drawn.
-
-        Args:
-            self: refer to the current instance
-            x: the x coordinate of the card on the screen where the card is
-            y: the y coordinate of the card on the screen where the card is
-
-        Returns:
-            The rectangle shape that represents the card.
-        """
-        card_width, card_height = 100, 150
-        return pygame.Rect(x, y, card_width, card_height)
-
-
-# Card spacing (different constants for drawing and card positions):
-card_width, card_height = 100, 150  # card dimension
-space_width, space_height = 30, 15  # spacing from the left up corner
-space_cards = 15  # space between cards
-space_show, space_tableau = (
-    25,
-    30,
-)  # space right between show_pile cards/ space down between cards in tableau
-transparent_color = (20, 220, 50)  # (20,220,50,100)
-
-# spacing from left top corner
-stock_width, stock_height = space_width, space_height
-show_width, show_height = card_width + space_width + space_cards, space_height
-foundation_width, foundation_height = (
-    space_width + (card_width + space_cards) * 3,
-    space_height,
-)
-tableau_width, tableau_height = (
-    space_width,
-    card_height + space_height + space_cards * 2,
-)
-
-# Solitaire components (the five piles):
-stock_pile = []  # cards to be drawn and used up-left, vector
-show_pile = []  # the cards shown that can be used, vector 3 elements
-waste_pile = []  # cards not chosen to be used and that will be reused later
-foundation = [[], [], [], []]  # cards to be completed up-right, vector x4 each symbol
-tableau = [[], [], [], [], [], [], []]  # cards to be used down, vector x7
-
-
-# Methods that interact with the piles and the deck of cards
-def generate_card_deck():
-    """
-    Generate a new deck of cards.
-
-    Args:
-        None
-
-    Returns:
-        The newly generated deck of cards
-    """
-    symbols = ["clubs", "diamonds", "hearts", "spades"]
-    deck = []
-    for number in range(1, 14):
-        for symbol in symbols:
-            card = Card(number, symbol)
-            deck.append(card)
-
-    return deck
-
-
-def shuffle_deck(deck):
-    """
-    Shuffle the deck.
-
-    Args:
-        None
-
-    Returns:
-        The shuffled deck
-    """
-    random.shuffle(deck)
-
-
-def split_deck_in_components(deck):
-    """
-    Splits the deck of cards in the different piles. Stock and tableau are the piles that
-    are generated at the start of the game.
-
-    Args:
-        deck: the deck of cards
-
-    Returns:
-        The stock pile and the tableau at the start of a new game.
-    """
-    stock_pile = []
-    tableau = [[], [], [], [], [], [], []]
-    tableau_index = 1
-    tableau_total = 1
-
-    for index, card in enumerate(deck):
-        if index < 28:
-            if index < tableau_total:
-                tableau[tableau_index - 1] = [card] + tableau[tableau_index - 1]
-            else:
-                tableau_index += 1
-                tableau_total += tableau_index
-                tableau[tableau_index - 1] = [card] + tableau[tableau_index - 1]
-        else:
-            stock_pile.append(card)
-
-    # last cards in each tableau column need to be face up
-    for i in range(7):
-        tableau[i][i].flip()
-
-    return stock_pile, tableau
-
-
-def update_waste_pile(waste_pile):
-    """
-    Updates the waste pile with the cards not used from the show pile.
-
-    Args:
-        waste_pile: the waste pile that needs updating
-
-    Returns:
-        The updated waste_pile
-    """
-
-    show_cards = []
-
-    if show_pile:
-        for card in show_pile:
-            show_cards += [card]
-
-        waste_pile += show_cards[::-1]
-
-        # waste_pile=waste_pile + [show_pile[2]]+ [show_pile[1]]+ [show_pile[0]]
-
-    return waste_pile
-
-
-def flip_show_pile(show_pile):
-    """
-    Flips the cards in the show pile if some are not already flipped
-
-    Args:
-        show_pile: the show pile
-
-    Returns:
-        The updated show pile
-    """
-    for card in show_pile:
-        if card.face_up == False:
-            card.flip()
-
-    return show_pile
-
-
-def stock_draw(stock_pile, show_pile, waste_pile):
-    """
-    Draw cards from the stock pile and update the stock,show and waste piles accordingly.
-
-    Args:
-        stock_pile: stock pile
-        show_pile: show pile
-        waste_pile: waste pile
-
-    Returns:
-        The updated stock,show and waste piles.
-    """
-    if (game_mode==3):
-        if len(stock_pile) >= 3:
-            waste_pile = update_waste_pile(waste_pile)
-            show_pile = [stock_pile[2], stock_pile[1], stock_pile[0]]
-            show_pile = flip_show_pile(show_pile)
-            stock_pile = stock_pile[3:]
-
-        elif len(stock_pile) == 2:
-            waste_pile = update_waste_pile(waste_pile)
-            if waste_pile:
-                show_pile = [waste_pile[-1], stock_pile[1], stock_pile[0]]
-            else:
-                show_pile = [stock_pile[1], stock_pile[0]]
-            show_pile = flip_show_pile(show_pile)
-            stock_pile = []
-
-        elif len(stock_pile) == 1:
-            waste_pile = update_waste_pile(waste_pile)
-
-            if len(waste_pile) >= 2:
-                show_pile = [waste_pile[-1], waste_pile[-2], stock_pile[0]]
-            elif waste_pile:
-                show_pile = [waste_pile[-1], stock_pile[0]]
-            else:
-                show_pile = [stock_pile[0]]
-            show_pile = flip_show_pile(show_pile)
-            stock_pile = []
-
-        else:
-            waste_pile = update_waste_pile(waste_pile)
-
-            # remove duplicates
-            new_waste_pile = []
-            seen_elements = set()
-            for element in waste_pile:
-                if element not in seen_elements:
-                    new_waste_pile.append(element)
-                    seen_elements.add(element)
-
-            show_pile = []
-            stock_pile = new_waste_pile
-            waste_pile = []
-
-            for card in stock_pile:
-                card.flip()
-    elif game_mode==1:
-        waste_pile = update_waste_pile(waste_pile)
-        if (stock_pile):
-            show_pile=[stock_pile[0]]
-            show_pile = flip_show_pile(show_pile)
-            stock_pile=stock_pile[1:]
-        else:
-            show_pile = []
-            stock_pile = waste_pile
-            waste_pile = []
-
-            for card in stock_pile:
-                card.flip()
-
-
-    return stock_pile, show_pile, waste_pile
-
-
-def remove_card_start_location(screen, drawn_card_location, drawn_card_position):
-    """
-    Remove the moving card from where it was taken (if it is placed correctly).
-
-    Args:
-        screen: pygame screen
-        drawn_card_location: which pile it is in (tableau-t, foundation-f, show-s)
-        drawn_card_position: position in the pile
-
-    Returns:
-        The updated drawn_card_location, drawn_card_position.
-    """
-
-    if drawn_card_location == "s":
-        del show_pile[drawn_card_position]
-        pygame.draw.rect(
-            screen,
-            (20, 150, 50),
-            (show_width, show_height, card_width + 2 * space_show, card_height),
-        )
-        draw_show(screen)
-
-    elif drawn_card_location == "f":
-        del foundation[drawn_card_position // 10][drawn_card_position % 10]
-        pygame.draw.rect(
-            screen,
-            (20, 150, 50),
-            (
-                foundation_width,
-                foundation_height,
-                (card_width + space_cards) * 4,
-                card_height,
-            ),
-        )
-        draw_foundation(screen)
-
-    elif drawn_card_location == "t":
-        nr_tableau = drawn_card_position // 10
-        length = len(tableau[nr_tableau])
-
-        for index in range(
-            len(tableau[drawn_card_position // 10]) - 1,
-            drawn_card_position % 10 - 1,
-            -1,
-        ):
-            del tableau[drawn_card_position // 10][index]
-
-        # last card face up
-        if tableau[nr_tableau]:
-            if tableau[nr_tableau][-1].face_up == False:
-                tableau[nr_tableau][-1].flip()
-
-        pygame.draw.rect(
-            screen,
-            (20, 150, 50),
-            (
-                tableau_width + nr_tableau * (card_width + space_cards),
-                tableau_height,
-                card_width,
-                card_height + space_tableau * length,
-            ),
-        )
-        draw_tableau(screen, nr_tableau)
-
-    drawn_card_location = None
-    drawn_card_position = None
-
-    return drawn_card_location, drawn_card_position
-
-
-def place_card_foundation(placed_card, nr_foundation):
-    """
-    Verifies if the a card can be placed in foundation.
-
-    Args:
-        placed_card: the card that will be placed
-        nr_foundation: which foundation pile
-
-    Returns:
-        True/False if the card can be placed in the foundation
-    """
-    if foundation[nr_foundation]:
-        if (
-            placed_card.number - 1 == foundation[nr_foundation][-1].number
-            and placed_card.symbol == foundation[nr_foundation][-1].symbol
-        ):
-            return True
-
-    elif placed_card.number == 1:
-        return True
-
-    return False
-
-
-def opposed_color_symbol(symbol1, symbol2):
-    """
-    Verify if two cards symbols are the different colour (red-black)
-
-    Args:
-        symbol1: symbol of first card
-        smymbol2: symbol of second card
-
-    Returns:
-        True/False if it is the opposed color or not.
-    """
-    if symbol1 == "clubs" or symbol1 == "spades":
-        if symbol2 == "hearts" or symbol2 == "diamonds":
-            return True
-        else:
-            return False
-
-    elif symbol1 == "hearts" or symbol1 == "diamonds":
-        if symbol2 == "clubs" or symbol2 == "spades":
-            return True
-        else:
-            return False
-
-
-def place_card_tableau(placed_card, nr_tableau):
-    """
-    Verifies if the a card can be placed in tableau.
-
-    Args:
-        placed_card: the card that will be placed
-        nr_tableau: which tableau pile
-
-    Returns:
-        True/False if the card can be placed in the tableau
-    """
-    if tableau[nr_tableau]:
-        if (
-            placed_card.number + 1 == tableau[nr_tableau][-1].number
-            and opposed_color_symbol(placed_card.symbol, tableau[nr_tableau][-1].symbol)
-            == True
-        ):
-            return True
-
-    elif placed_card.number == 13:
-        return True
-
-    return False
-
-
-def end_game():
-    """
-    Verifies if the foundation pile is completed and the game is finished
-
-    Args:
-        None
-
-    Returns:
-        True/False if the game is finished
-    """
-    for columns in foundation:
-        if len(columns) != 13:
-            return False
-
-    else:
-        return True
-
-
-# Methods for drawing piles/cards/buttons
-
-
-def draw_rect_alpha(screen, color, rect):
-    """
-    Draw a rectangle (the ones on which the piles and cards will be placed)
-
-    Args:
-        screen: pygame screen
-        color: color of the rectangle
-        rect: rectangle object which will be drawn
-
-    Returns:
-        None
-    """
-    shape_surf = pygame.Surface(pygame.Rect(rect).size, pygame.SRCALPHA)
-    pygame.draw.rect(shape_surf, color, shape_surf.get_rect())
-    screen.blit(shape_surf, rect)
-
-
-def draw_stock(screen):
-    """
-    Draw the stock pile
-
-    Args:
-        screen: pygame screen
-
-    Returns:
-        None
-    """
-    draw_rect_alpha(
-        screen, transparent_color, (stock_width, stock_height, card_width, card_height)
-    )
-    if stock_pile:
-        stock_pile[0].draw(screen, stock_width, stock_height)
-
-
-def draw_show(screen):
-    """
-    Draw the show pile
-
-    Args:
-        screen: pygame screen
-
-    Returns:
-        None
-    """
-    draw_rect_alpha(
-        screen, transparent_color, (show_width, show_height, card_width, card_height)
-    )
-    if show_pile:
-        for index, card in enumerate(show_pile):
-            card.draw(screen, show_width + index * space_show, show_height)
-
-
-def draw_foundation(screen):
-    """
-    Draw the foundation piles
-
-    Args:
-        screen: pygame screen
-
-    Returns:
-        None
-    """
-    for nr_foundation in range(4):
-        draw_rect_alpha(
-            screen,
-            transparent_color,
-            (
-                foundation_width + (card_width + space_cards) * nr_foundation,
-                foundation_height,
-                card_width,
-                card_height,
-            ),
-        )
-        if foundation[nr_foundation]:
-            foundation[nr_foundation][-1].draw(
-                screen,
-                foundation_width + (card_width + space_cards) * nr_foundation,
-                foundation_height,
-            )
-
-
-def draw_tableau(screen, nr_tableau):
-    """
-    Draw the tableau pile with index nr_tableau
-
-    Args:
-        screen: pygame screen
-        nr_tableau: tableau index
-
-    Returns:
-        None
-    """
-    draw_rect_alpha(
-        screen,
-        transparent_color,
-        (
-            tableau_width + (card_width + space_cards) * nr_tableau,
-            tableau_height,
-            card_width,
-            card_height,
-        ),
-    )
-    if tableau[nr_tableau]:
-        for index, card in enumerate(tableau[nr_tableau]):
-            card.draw(
-                screen,
-                tableau_width + (card_width + space_cards) * nr_tableau,
-                tableau_height + space_tableau * index,
-            )
-
-
-def draw_tableau_specific(screen, nr_tableau, start_card_index, final_card_index):
-    """
-    Draw the tableau pile with index nr_tableau, but only some cards
-
-    Args:
-        screen: pygame screen
-        nr_tableau: index of tableau pile
-        start_card_index: starting index of cards
-        final_card_index: ending index of cards
-
-    Returns:
-        None
-    """
-    if not tableau[nr_tableau]:
-        draw_rect_alpha(
-            screen,
-            transparent_color,
-            (
-                tableau_width + (card_width + space_cards) * nr_tableau,
-                tableau_height,
-                card_width,
-                card_height,
-            ),
-        )
-
-    if tableau[nr_tableau] and (len(tableau[nr_tableau]) > final_card_index):
-        for index in range(start_card_index, final_card_index + 1):
-            tableau[nr_tableau][index].draw_top(
-                screen,
-                tableau_width + (card_width + space_cards) * nr_tableau,
-                tableau_height + space_tableau * index,
-            )
-
-    if tableau[nr_tableau]:
-        # if(final_card_index-4<=len(tableau[nr_tableau])-1):
-        tableau[nr_tableau][len(tableau[nr_tableau]) - 1].draw(
-            screen,
-            tableau_width + (card_width + space_cards) * nr_tableau,
-            tableau_height + space_tableau * (len(tableau[nr_tableau]) - 1),
-        )
-
-
-def draw_cards(screen):
-    """
-    Draw all card piles on the screen.
-
-    Args:
-        screen: pygame screen
-
-    Returns:
-        None
-    """
-    # green background
-    screen.fill((20, 150, 50))
-
-    # stock pile
-    draw_stock(screen)
-    # show pile
-    draw_show(screen)
-
-    # foundation
-    draw_foundation(screen)
-
-    # tableau
-    for nr_tableau in range(7):
-        draw_tableau(screen, nr_tableau)
-
-
-# Measurments for draw_dirty_portion
-xl_stock = stock_width
-xr_stock = stock_width + card_width
-yt_stock = stock_height
-yb_stock = stock_height + card_height
-
-xl_show = show_width
-xr_show = show_width + card_width + 2 * space_show
-yt_show = show_height
-yb_show = show_height + card_height
-
-xl_foundation = foundation_width
-xr_foundation = foundation_width + card_width * 4 + space_cards * 3
-yt_foundation = foundation_height
-yb_foundation = foundation_height + card_height
-
-
-def draw_dirty_portion(screen, x_topleft, y_topleft, x_bottomright, y_bottomright):
-    """
-    Draw the portion of the screen where the moving card was, so that
-    it will not leave an empty space behind and the cards are still shown
-
-    Args:
-        screen: pygame screen
-        x_topleft: x coordinate of the topleft corner of the dirty rectangle
-        y_topleft: y coordinate of the topleft corner of the dirty rectangle
-        x_bottomright: x coordinate of the bottomright corner of the dirty rectangle
-        y_bottomright: y coordinate of the bottomright corner of the dirty rectangle
-
-    Returns:
-        None
-    """
-    # stock pile
-    if (
-        xl_stock <= x_topleft <= xr_stock or xl_stock <= x_bottomright <= xr_stock
-    ) and (yt_stock <= y_topleft <= yb_stock or yt_stock <= y_bottomright <= yb_stock):
-        draw_stock(screen)
-
-    # show pile
-    if (xl_show <= x_topleft <= xr_show or xl_show <= x_bottomright <= xr_show) and (
-        yt_show <= y_topleft <= yb_show or yt_show <= y_bottomright <= yb_show
-    ):
-        draw_show(screen)
-
-    # foundation
-    if (
-        xl_foundation <= x_topleft <= xr_foundation
-        or xl_foundation <= x_bottomright <= xr_foundation
-    ) and (
-        yt_foundation <= y_topleft <= yb_foundation
-        or yt_foundation <= y_bottomright <= yb_foundation
-    ):
-        draw_foundation(screen)
-
-    # tableau
-    if tableau_height < y_bottomright:
-        counter_width = (x_bottomright - tableau_width) / (card_width + space_cards)
-        counter_height_top = (y_topleft - tableau_height) / space_tableau
-        counter_height_bottom = (y_bottomright - tableau_height) / space_tableau
-        # momentan card_height=5*space_tableau
-
-        if 1 <= counter_width < 7:
-            s_index, f_index = adjust_counter_heights(
-                counter_height_top, counter_height_bottom, math.ceil(counter_width - 1)
-            )
-
-            draw_tableau_specific(
-                screen, math.ceil(counter_width - 1), s_index, f_index
-            )
-
-            s_index, f_index = adjust_counter_heights(
-                counter_height_top, counter_height_bottom, math.floor(counter_width - 1)
-            )
-            draw_tableau_specific(
-                screen, math.floor(counter_width - 1), s_index, f_index
-            )
-
-        elif 7 <= counter_width < 8:
-            s_index, f_index = adjust_counter_heights(
-                counter_height_top, counter_height_bottom, 6
-            )
-            draw_tableau_specific(screen, 6, s_index, f_index)
-
-        elif 0 <= counter_width:
-            s_index, f_index = adjust_counter_heights(
-                counter_height_top, counter_height_bottom, 0
-            )
-            draw_tableau_specific(screen, 0, s_index, f_index)
-
-
-def adjust_counter_heights(counter_height_top, counter_height_bottom, counter_width):
-    """
-    Determines the card indexes that need drawing
-
-    Args:
-        counter_height_top: counter of topleft corner of height
-        counter_height_bottom: counter of bottomright corner of height
-        counter_width: counter of width
-
-    Returns:
-        Starting and final indexes of the cards that need to be redrawn
-    """
-    nr_cards = len(tableau[counter_width])
-
-    # moving card top under tableau or above tableau
-    if counter_height_top > nr_cards + 4 or counter_height_bottom < 0:
-        s_index, f_index = nr_cards, nr_cards
-
-    # moving card top at last card
-    elif counter_height_top >= nr_cards - 1:
-        s_index, f_index = nr_cards - 1, nr_cards - 1
-
-    else:
-        s_index = math.floor(counter_height_top)
-        f_index = math.floor(counter_height_bottom)
-        if s_index < 0:
-            s_index = 0
-        if f_index >= nr_cards:
-            f_index = nr_cards - 1
-
-    return s_index, f_index
-
-
-#  draw button
-def draw_button(x, y, text_on_button):
-    """
-    Draw a button with text on it.
-
-    Args:
-        x: x coordinate on the screen
-        y: y coordinate on the screen
-        text_on_button: text to be drawn on the button
-
-    Returns:
-        None
-    """
-    button_width = 100
-    button_height = 40
-
-    pygame.draw.rect(screen, (169, 169, 169), (x, y, button_width, button_height))
-    font = pygame.font.Font(None, 37)
-    text = font.render(text_on_button, True, (0, 0, 0))
-
-    text_width, text_height = font.size(text_on_button)
-    text_x = x + (button_width - text_width) // 2
-    text_y = y + (button_height - text_height) // 2
-    screen.blit(text, (text_x, text_y))
-
-
-# draw rules
-def draw_rules(screen, filename):
-    """
-    Draw the rules on the screen.
-
-    Args:
-        screen: pygame screen
-        filename: name of the txt file which will be used to get the rules from
-
-    Returns:
-        None
-    """
-    screen.fill((20, 150, 50), (0, 0, 900, 750))
-    font = pygame.font.Font(None, 30)
-    try:
-        with open(filename, "r") as file:
-            rules_text = file.read()
-            lines = rules_text.splitlines()
-
-            # Render each line separately
-            y_offset = 50
-            for line in lines:
-                text = font.render(line, True, (0, 0, 0))
-                screen.blit(text, (50, y_offset))
-                y_offset += text.get_height() + 5
-    except FileNotFoundError:
-        print(f"File not found: {filename}")
-
-
-def pick_card(card_x, card_y, position):
-    """
-    Update offsets for moving card
-
-    Args:
-        card_x: last x coordinate on the screen of the card
-        card_y: last y coordinate on the screen of the card
-        position: current card position
-
-    Returns:
-        The updated offsets
-    """
-    offset_x = card_x - position[0]
-    offset_y = card_y - position[1]
-
-    return offset_x, offset_y
-
-
-def move_card(offset_x, offset_y, position):
-    """
-    Update the position coordinates  of the card.
-
-    Args:
-        offset_x: offset x of the card
-        offset_y: offset y of the card
-        position: current card position
-
-    Returns:
-        The updated coordinates of the card
-    """
-    card_x = position[0] + offset_x
-    card_y = position[1] + offset_y
-
-    return card_x, card_y
-
-
-def set_moving(width, height, event):
-    """
-    Set the card as moving and update coordinates
-
-    Args:
-        width: current x of the card
-        height: current y of the card
-        event: the event (mouseclick)
-
-
-    Returns:
-        None
-    """
-    global moving, drawn_card_x, drawn_card_y, offset_x, offset_y
-    moving = True
-    drawn_card_x, drawn_card_y = width, height
-    offset_x, offset_y = pick_card(width, height, event.pos)
-
-
-# TEST
-# card1=Card(7,"clubs")
-# card2=Card(13,"hearts")
-# card2.flip()
-
-# for j in range(0,4):
-#     for i in range(0,13):
-#         foundation[j].append(card2)
-
-
-# SOLITAIRE
-# start pygame
-pygame.init()
-
-# window
-width, height = 1000, 750
-screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
-pygame.display.set_caption("Solitaire")
-
-clock = pygame.time.Clock()
-moving = False
-drawn_card = None
-game_mode=3
-
-drawn_card_location = None  # s-show f-foundation t-tableau
-drawn_card_position = None  # index in vector s-1,2,3 ; f,t- ab unde a->[nr_foundation/nr_tableau]; b-> pozitia in a
-
-rules_drawn = False
-
-font = pygame.font.Font(None, 36)
-
-# deck preparation and draw the board
-deck = generate_card_deck()
-shuffle_deck(deck)
-stock_pile, tableau = split_deck_in_components(deck)
-draw_cards(screen)
-
-dirty_rect = None
-
-# main game loop
-while True:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-        elif event.type == pygame.VIDEORESIZE:
-            draw_cards(screen)
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1:  # Left mouse button
-                # click on stock_pile
-                if (
-                    stock_width < event.pos[0] < stock_width + card_width
-                    and stock_height < event.pos[1] < stock_height + card_height
-                ):
-                    stock_pile, show_pile, waste_pile = stock_draw(
-                        stock_pile, show_pile, waste_pile
-                    )
-
-                    # draw stock and show again
-                    portion_rect = pygame.Rect(
-                        stock_width,
-                        stock_height,
-                        show_width + card_width + space_show * 2,
-                        card_height,
-                    )
-                    pygame.draw.rect(screen, (20, 150, 50), portion_rect)
-                    draw_show(screen)
-                    draw_stock(screen)
-
-                # RESET BUTTON
-                elif 900 <= event.pos[0] <= 1000 and 120 <= event.pos[1] <= 160:
-                    deck = generate_card_deck()
-                    shuffle_deck(deck)
-                    stock_pile, tableau = split_deck_in_components(deck)
-                    waste_pile = []
-                    show_pile = []
-                    foundation = [[], [], [], []]
-                    draw_cards(screen)
-                    rules_drawn = False
-
-                # RULES BUTTON
-                elif 900 <= event.pos[0] <= 1000 and 170 <= event.pos[1] <= 210:
-                    if rules_drawn:
-                        draw_cards(screen)
-                        rules_drawn = False
-                    else:
-                        draw_rules(screen, "Proiect Python/rules.txt")
-                        rules_drawn = True
-
-                elif 900 <= event.pos[0] <= 1000 and 220 <= event.pos[1] <= 260:
-                     
-                    # change game mode
-                    if game_mode==3:
-                        game_mode=1
-                    elif game_mode==1:
-                        game_mode=3
-                    
-                    # reset game
-                    deck = generate_card_deck()
-                    shuffle_deck(deck)
-                    stock_pile, tableau = split_deck_in_components(deck)
-                    waste_pile = []
-                    show_pile = []
-                    foundation = [[], [], [], []]
-                    draw_cards(screen)
-                    rules_drawn = False
-
-                # move card in show_pile
-                if (
-                    len(show_pile) == 3
-                    and show_width + space_show * 2
-                    < event.pos[0]
-                    < show_width + space_show * 2 + card_width
-                    and show_height < event.pos[1] < show_height + card_height
-                ):
-                    set_moving(show_width + space_show * 2, show_height, event)
-                    drawn_card = show_pile[2]
-                    drawn_card_location = "s"
-                    drawn_card_position = 2
-
-                elif (
-                    len(show_pile) == 2
-                    and show_width + space_show
-                    < event.pos[0]
-                    < show_width + space_show + card_width
-                    and show_height < event.pos[1] < show_height + card_height
-                ):
-                    set_moving(show_width + space_show, show_height, event)
-                    drawn_card = show_pile[1]
-                    drawn_card_location = "s"
-                    drawn_card_position = 1
-
-                elif (
-                    len(show_pile) == 1
-                    and show_width < event.pos[0] < show_width + card_width
-                    and show_height < event.pos[1] < show_height + card_height
-                ):
-                    set_moving(show_width, show_height, event)
-                    drawn_card = show_pile[0]
-                    drawn_card_location = "s"
-                    drawn_card_position = 0
-
-                # move card in foundation
-                elif (
-                    foundation[0]
-                    and foundation_width < event.pos[0] < foundation_width + card_width
-                    and foundation_height
-                    < event.pos[1]
-                    < foundation_height + card_height
-                ):
-                    set_moving(foundation_width, foundation_height, event)
-                    drawn_card = foundation[0][-1]
-                    drawn_card_location = "f"
-                    drawn_card_position = len(foundation[0]) - 1
-
-                elif (
-                    foundation[1]
-                    and foundation_width + (card_width + space_cards)
-                    < event.pos[0]
-                    < foundation_width + (card_width + space_cards) + card_width
-                    and foundation_height
-                    < event.pos[1]
-                    < foundation_height + card_height
-                ):
-                    set_moving(
-                        foundation_width + (card_width + space_cards),
-                        foundation_height,
-                        event,
-                    )
-                    drawn_card = foundation[1][-1]
-                    drawn_card_location = "f"
-                    drawn_card_position = 10 + len(foundation[1]) - 1
-
-                elif (
-                    foundation[2]
-                    and foundation_width + (card_width + space_cards) * 2
-                    < event.pos[0]
-                    < foundation_width + (card_width + space_cards) * 2 + card_width
-                    and foundation_height
-                    < event.pos[1]
-                    < foundation_height + card_height
-                ):
-                    set_moving(
-                        foundation_width + (card_width + space_cards) * 2,
-                        foundation_height,
-                        event,
-                    )
-                    drawn_card = foundation[2][-1]
-                    drawn_card_location = "f"
-                    drawn_card_position = 20 + len(foundation[2]) - 1
-
-                elif (
-                    foundation[3]
-                    and foundation_width + (card_width + space_cards) * 3
-                    < event.pos[0]
-                    < foundation_width + (card_width + space_cards) * 3 + card_width
-                    and foundation_height
-                    < event.pos[1]
-                    < foundation_height + card_height
-                ):
-                    set_moving(
-                        foundation_width + (card_width + space_cards) * 3,
-                        foundation_height,
-                        event,
-                    )
-                    drawn_card = foundation[3][-1]
-                    drawn_card_location = "f"
-                    drawn_card_position = 30 + len(foundation[3]) - 1
-
-                # move card in foundation
-                else:
-                    counter_width_pos = (event.pos[0] - tableau_width) / (
-                        card_width + space_cards
-                    )
-                    counter_height_pos = (event.pos[1] - tableau_height) / space_tableau
-                    nr_tableau = math.floor(counter_width_pos)
-
-                    if 0 <= nr_tableau <= 6:
-                        if 0 <= counter_height_pos - len(tableau[nr_tableau]) + 1 <= 5:
-                            set_moving(
-                                tableau_width + (card_width + space_cards) * nr_tableau,
-                                tableau_height
-                                + space_tableau * (len(tableau[nr_tableau]) - 1),
-                                event,
-                            )
-                            drawn_card = tableau[nr_tableau][-1]
-                            drawn_card_location = "t"
-                            drawn_card_position = (
-                                10 * nr_tableau + len(tableau[nr_tableau]) - 1
-                            )
-
-                        elif (
-                            0
-                            <= math.floor(counter_height_pos)
-                            < len(tableau[nr_tableau]) - 1
-                            and tableau[nr_tableau][
-                                math.floor(counter_height_pos)
-                            ].face_up
-                            == True
-                        ):
-                            set_moving(
-                                tableau_width + (card_width + space_cards) * nr_tableau,
-                                tableau_height
-                                + space_tableau * math.floor(counter_height_pos),
-                                event,
-                            )
-                            drawn_card = tableau[nr_tableau][
-                                math.floor(counter_height_pos)
-                            ]
-                            drawn_card_location = "t"
-                            drawn_card_position = 10 * nr_tableau + math.floor(
-                                counter_height_pos
-                            )
-
-        elif event.type == pygame.MOUSEBUTTONUP:
-            moving = False
-
-            if drawn_card:
-                middle_card_x = drawn_card_x + card_width / 2
-                middle_card_y = drawn_card_y + card_height / 2
-
-                # card placed in foundation
-                if (
-                    foundation_width
-                    <= middle_card_x
-                    <= foundation_width + (card_width + space_cards) * 4
-                    and foundation_height
-                    <= middle_card_y
-                    <= foundation_height + card_height
-                ):
-                    middle_card_x = middle_card_x - foundation_width
-                    nr_foundation = math.floor(
-                        middle_card_x / (card_width + space_cards)
-                    )
-
-                    if place_card_foundation(drawn_card, nr_foundation) == True:
-                        # cards in tableau need to be last in column to be placed in foundation
-                        if drawn_card_location == "t":
-                            if (
-                                drawn_card_position % 10
-                                == len(tableau[drawn_card_position // 10]) - 1
-                            ):
-                                foundation[nr_foundation].append(drawn_card)
-                                (
-                                    drawn_card_location,
-                                    drawn_card_position,
-                                ) = remove_card_start_location(
-                                    screen, drawn_card_location, drawn_card_position
-                                )
-
-                        else:
-                            foundation[nr_foundation].append(drawn_card)
-                            (
-                                drawn_card_location,
-                                drawn_card_position,
-                            ) = remove_card_start_location(
-                                screen, drawn_card_location, drawn_card_position
-                            )
-
-                # card placed in tableau
-                if (
-                    tableau_width
-                    <= middle_card_x
-                    <= tableau_width + (card_width + space_cards) * 7
-                    and tableau_height <= middle_card_y
-                ):
-                    middle_card_x = middle_card_x - tableau_width
-                    middle_card_y = middle_card_y - tableau_height
-                    nr_tableau = math.floor(middle_card_x / (card_width + space_cards))
-                    position_column = math.floor(middle_card_y / space_tableau)
-                    length_column = len(tableau[nr_tableau])
-
-                    if length_column <= position_column <= length_column + 4:
-                        if place_card_tableau(drawn_card, nr_tableau) == True:
-                            if drawn_card_location == "t":
-                                for index in range(
-                                    drawn_card_position % 10,
-                                    len(tableau[drawn_card_position // 10]),
-                                ):
-                                    tableau[nr_tableau].append(
-                                        tableau[drawn_card_position // 10][index]
-                                    )
-                                (
-                                    drawn_card_location,
-                                    drawn_card_position,
-                                ) = remove_card_start_location(
-                                    screen, drawn_card_location, drawn_card_position
-                                )
-                            else:
-                                tableau[nr_tableau].append(drawn_card)
-                                (
-                                    drawn_card_location,
-                                    drawn_card_position,
-                                ) = remove_card_start_location(
-                                    screen, drawn_card_location, drawn_card_position
-                                )
-
-                # drawn_card will dissapear
-                drawn_card = None
-
-        elif event.type == pygame.MOUSEMOTION:
-            if moving:
-                drawn_card_x, drawn_card_y = move_card(offset_x, offset_y, event.pos)
-
-    # Clear the screen only for dirty rect (the moving card)
-    if dirty_rect:
-        # coordiantes of dirty_rect
-        x_topleft = dirty_rect.topleft[0]
-        y_topleft = dirty_rect.topleft[1]
-        x_bottomright = dirty_rect.bottomright[0]
-        y_bottomright = dirty_rect.bottomright[1]
-
-        screen.fill((20, 150, 50), dirty_rect)
-        draw_dirty_portion(screen, x_topleft, y_topleft, x_bottomright, y_bottomright)
-        dirty_rect = None
-
-    # Draw the moving card if it exists
-    if drawn_card:
-        # Calculate the dirty rect for the drawn card
-        dirty_rect = drawn_card.get_rect_at(drawn_card_x, drawn_card_y)
-        drawn_card.draw(screen, drawn_card_x, drawn_card_y)
-
-    # END GAME
-    if end_game() == True:
-        font2 = pygame.font.Font(None, 50)
-        text_surface = font2.render("CONGRATULATIONS, YOU WON!", True, (255, 150, 0))
-        screen.blit(text_surface, (220, 600))
-
-    # RESET BUTTON
-    draw_button(900, 120, "RESET")
-
-    # RULES BUTTON
-    draw_button(900, 170, "RULES")
-
-    # RULES BUTTON
-    draw_button(900, 220, "MODE")
-
-    # FPS AND MS
-    fps = int(clock.get_fps())
-    ms_per_frame = clock.get_time()
-
-    fps_text = font.render(f"FPS: {fps}", True, (0, 0, 0))
-    ms_text = font.render(f"MS: {ms_per_frame}", True, (0, 0, 0))
-
-    portion_rect = pygame.Rect(900, 0, 100, 100)
-    pygame.draw.rect(screen, (20, 150, 50), portion_rect)
-    screen.blit(fps_text, (900, 10))
-    screen.blit(ms_text, (900, 50))
-
-    pygame.display.update()
-    clock.tick(60)
+import pygame
+import sys
+import math
+import os
+import random
+import deal_index
+import engine
+import moves
+import replay
+import savegame
+from card_assets import CardAssetSets
+from compositor import Compositor
+from frame_timing import FramePolicy, PhaseProfiler
+from layout import BoardLayout, base_board_height, base_board_width, fit_scale
+from render_cache import BoardLayer, DragLayer, RulesOverlay, TextCache
+
+
+def draw_card(screen, card, face_up, x, y):
+    """
+    Draw a card on the screen.
+
+    Args:
+        screen: the pygame screen
+        card: code of the card (0..51, see engine.py)
+        face_up: True to draw the face, False for the back
+        x: the x coordinate of the card on the screen where the card will begin drawing
+        y: the y coordinate of the card on the screen where the card will begin drawing
+
+    Returns:
+        None
+    """
+    if face_up:
+        screen.blit(card_images.card(card), (x, y))
+    else:
+        screen.blit(card_images.back(), (x, y))
+
+
+def draw_card_top(screen, card, face_up, x, y):
+    """
+    Draw only the top size of the card. The first 30 pixels as height.
+
+    Args:
+        screen: the pygame screen
+        card: code of the card (0..51, see engine.py)
+        face_up: True to draw the face, False for the back
+        x: the x coordinate of the card on the screen where the card will begin drawing
+        y: the y coordinate of the card on the screen where the card will begin drawing
+
+    Returns:
+        None
+    """
+
+    # draw only the top 30 pixels of the card (space_tableau dimension)
+    top_portion_rect = pygame.Rect(0, 0, card_width, space_tableau)
+
+    if face_up:
+        screen.blit(card_images.card(card), (x, y), area=top_portion_rect)
+    else:
+        screen.blit(card_images.back(), (x, y), area=top_portion_rect)
+
+
+# The measurements of the board (see layout.py) are kept as module globals for the
+# drawing code; set_board_scale() computes them for the size of the window
+transparent_color = (20, 220, 50)  # (20,220,50,100)
+
+# card images, one scaled set per card size (the last few sizes are kept)
+card_asset_sets = CardAssetSets()
+
+# the game being played (the five piles and the rules), dealt by new_game()
+state = engine.GameState()
+# the legal moves of the game, kept up to date as moves are made
+move_generator = moves.MoveGenerator(state)
+# the moves made, for undo and redo
+move_log = engine.MoveLog(state)
+
+
+def new_game():
+    """
+    Deal a new game in the current game mode: a deal known to be winnable when there
+    is an index of winnable deals for the mode (see deal_index.py), otherwise a random
+    seed. The seed is shown in the window title, so the deal can be played again.
+
+    Args:
+        None
+
+    Returns:
+        The GameState of the new game.
+    """
+    global game_seed
+
+    index = winnable_deals.get(game_mode)
+    game_seed = index.pick() if index else None
+    if game_seed is None:
+        game_seed = random.randint(0, deal_index.max_seed)
+    pygame.display.set_caption(f"Solitaire #{game_seed}")
+    return engine.seeded_game(game_seed, game_mode)
+
+
+def set_state(new_state):
+    """
+    Make a game the one being played, with its own move generator and move log.
+
+    Args:
+        new_state: the GameState
+
+    Returns:
+        None
+    """
+    global state, move_generator, move_log
+
+    state = new_state
+    move_generator = moves.MoveGenerator(state)
+    move_log = engine.MoveLog(state)
+    stop_auto_moves()
+
+
+def play_move(move):
+    """
+    Make a move if it follows the rules, logging it for undo.
+
+    Args:
+        move: (source, source_nr, count, destination, destination_nr)
+
+    Returns:
+        True/False if the move was made
+    """
+    if not move_log.play(move):
+        return False
+    move_generator.touch(move)
+    if recorder:
+        recorder.move(move)
+    return True
+
+
+def deal_game(reason):
+    """
+    Deal a new game and make it the one being played.
+
+    Args:
+        reason: why, for the replay ("start", "reset" or "mode")
+
+    Returns:
+        None
+    """
+    set_state(new_game())
+    if recorder:
+        recorder.deal(game_seed, game_mode, reason)
+    start_auto_moves()
+
+
+# Methods for drawing piles/cards/buttons
+
+
+def clear_rect(screen, rect):
+    """
+    Restore the background (felt, pile rectangles, button frames) over a rectangle of
+    the screen.
+
+    Args:
+        screen: pygame screen
+        rect: rectangle that will be cleared
+
+    Returns:
+        None
+    """
+    board_layer.restore(screen, rect)
+    compositor.mark(rect)
+
+
+def tableau_column_rect(nr_tableau):
+    """
+    Get the rectangle covered by a tableau pile (at least one card high).
+
+    Args:
+        nr_tableau: tableau index
+
+    Returns:
+        The rectangle of the tableau pile.
+    """
+    return layout.column_rect(nr_tableau, len(state.tableau[nr_tableau]))
+
+
+def draw_stock(screen):
+    """
+    Draw the stock pile
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    board_layer.restore(screen, (stock_width, stock_height, card_width, card_height))
+    if state.stock_size():
+        draw_card(
+            screen, state.cycle[state.stock_start], False, stock_width, stock_height
+        )
+    compositor.mark(stock_rect)
+
+
+def draw_show(screen):
+    """
+    Draw the show pile
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    board_layer.restore(screen, (show_width, show_height, card_width, card_height))
+    for index, card in enumerate(state.show_pile()):
+        draw_card(screen, card, True, show_width + index * space_show, show_height)
+    compositor.mark(show_rect)
+
+
+def draw_foundation(screen):
+    """
+    Draw the foundation piles
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    for nr_foundation in range(4):
+        board_layer.restore(
+            screen,
+            (
+                foundation_width + (card_width + space_cards) * nr_foundation,
+                foundation_height,
+                card_width,
+                card_height,
+            ),
+        )
+        if state.foundation[nr_foundation]:
+            draw_card(
+                screen,
+                state.foundation[nr_foundation][-1],
+                True,
+                foundation_width + (card_width + space_cards) * nr_foundation,
+                foundation_height,
+            )
+    compositor.mark(foundation_rect)
+
+
+def draw_tableau(screen, nr_tableau):
+    """
+    Draw the tableau pile with index nr_tableau
+
+    Args:
+        screen: pygame screen
+        nr_tableau: tableau index
+
+    Returns:
+        None
+    """
+    board_layer.restore(
+        screen,
+        (
+            tableau_width + (card_width + space_cards) * nr_tableau,
+            tableau_height,
+            card_width,
+            card_height,
+        ),
+    )
+    if state.tableau[nr_tableau]:
+        for index, card in enumerate(state.tableau[nr_tableau]):
+            draw_card(
+                screen,
+                card,
+                index >= state.hidden[nr_tableau],
+                tableau_width + (card_width + space_cards) * nr_tableau,
+                tableau_height + space_tableau * index,
+            )
+    compositor.mark(tableau_column_rect(nr_tableau))
+
+
+def draw_tableau_specific(screen, nr_tableau, start_card_index, final_card_index):
+    """
+    Draw the tableau pile with index nr_tableau, but only some cards
+
+    Args:
+        screen: pygame screen
+        nr_tableau: index of tableau pile
+        start_card_index: starting index of cards
+        final_card_index: ending index of cards
+
+    Returns:
+        None
+    """
+    tableau = state.tableau
+    if not tableau[nr_tableau]:
+        board_layer.restore(
+            screen,
+            (
+                tableau_width + (card_width + space_cards) * nr_tableau,
+                tableau_height,
+                card_width,
+                card_height,
+            ),
+        )
+
+    if tableau[nr_tableau] and (len(tableau[nr_tableau]) > final_card_index):
+        for index in range(start_card_index, final_card_index + 1):
+            draw_card_top(
+                screen,
+                tableau[nr_tableau][index],
+                index >= state.hidden[nr_tableau],
+                tableau_width + (card_width + space_cards) * nr_tableau,
+                tableau_height + space_tableau * index,
+            )
+
+    if tableau[nr_tableau]:
+        # if(final_card_index-4<=len(tableau[nr_tableau])-1):
+        draw_card(
+            screen,
+            tableau[nr_tableau][-1],
+            len(tableau[nr_tableau]) > state.hidden[nr_tableau],
+            tableau_width + (card_width + space_cards) * nr_tableau,
+            tableau_height + space_tableau * (len(tableau[nr_tableau]) - 1),
+        )
+    compositor.mark(tableau_column_rect(nr_tableau))
+
+
+def draw_cards(screen):
+    """
+    Draw all card piles on the screen.
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    # green background with the pile rectangles
+    board_layer.restore(screen)
+    compositor.mark_all()
+
+    # stock pile
+    draw_stock(screen)
+    # show pile
+    draw_show(screen)
+
+    # foundation
+    draw_foundation(screen)
+
+    # tableau
+    for nr_tableau in range(7):
+        draw_tableau(screen, nr_tableau)
+
+    # buttons
+    draw_hud(screen)
+
+
+# static background, pre-rendered once per window size
+board_layer = BoardLayer((20, 150, 50), transparent_color, (169, 169, 169))
+
+
+def set_board_scale(scale):
+    """
+    Compute all the measurements of the board (card dimension, spacing, pile and
+    button rectangles, hit grids, font sizes) for a scale of the 1000x750 board.
+
+    Args:
+        scale: the scale of the board (1 for the 1000x750 window)
+
+    Returns:
+        None
+    """
+    global layout, board_scale, card_width, card_height, space_width, space_height
+    global space_cards, space_show, space_tableau
+    global stock_width, stock_height, show_width, show_height
+    global foundation_width, foundation_height, tableau_width, tableau_height
+    global stock_rect, show_rect, foundation_rect
+    global button_width, button_height, reset_button_rect, rules_button_rect
+    global mode_button_rect, buttons_rect, counters_rect
+    global button_font_size, counters_font_size, banner_font_size, banner_position
+
+    layout = BoardLayout(scale)
+    board_scale = scale
+    card_width, card_height = layout.card_width, layout.card_height
+    space_width, space_height = layout.space_width, layout.space_height
+    space_cards = layout.space_cards
+    space_show, space_tableau = layout.space_show, layout.space_tableau
+
+    # spacing from left top corner
+    stock_width, stock_height = layout.stock_position
+    show_width, show_height = layout.show_position
+    foundation_width, foundation_height = layout.foundation_position
+    tableau_width, tableau_height = layout.tableau_position
+
+    # Measurments for draw_dirty_portion
+    stock_rect = layout.stock_rect
+    show_rect = layout.show_rect
+    foundation_rect = layout.foundation_rect
+
+    # buttons and counters on the right side
+    button_width, button_height = layout.button_width, layout.button_height
+    reset_button_rect = layout.reset_button_rect
+    rules_button_rect = layout.rules_button_rect
+    mode_button_rect = layout.mode_button_rect
+    buttons_rect = layout.buttons_rect
+    counters_rect = layout.counters_rect
+
+    button_font_size = round(37 * scale)
+    counters_font_size = round(36 * scale)
+    banner_font_size = round(50 * scale)
+    banner_position = (round(220 * scale), round(600 * scale))
+
+    board_layer.set_layout(
+        [stock_rect, layout.show_cards[0]]
+        + layout.foundation_cards
+        + [column[0] for column in layout.tableau_cards],
+        [reset_button_rect, rules_button_rect, mode_button_rect],
+    )
+
+
+set_board_scale(1)
+
+
+def draw_dirty_portion(screen, dirty_rect):
+    """
+    Draw the portion of the screen where the moving card was, so that
+    it will not leave an empty space behind and the cards are still shown.
+    Every pile that overlaps the dirty rectangle is redrawn, clipped to it.
+
+    Args:
+        screen: pygame screen
+        dirty_rect: the rectangle that needs to be redrawn
+
+    Returns:
+        None
+    """
+    screen.set_clip(dirty_rect)
+    board_layer.restore(screen, dirty_rect)
+    regions = layout.regions.touching(dirty_rect)
+    locations = {location for location, nr in regions}
+
+    # stock pile
+    if "stock" in locations:
+        draw_stock(screen)
+
+    # show pile
+    if "show" in locations:
+        draw_show(screen)
+
+    # foundation
+    if "foundation" in locations:
+        draw_foundation(screen)
+
+    # tableau, only the cards that show inside the dirty rectangle
+    for location, nr_tableau in regions:
+        if location == "tableau" and dirty_rect.colliderect(
+            tableau_column_rect(nr_tableau)
+        ):
+            s_index, f_index = dirty_card_indexes(dirty_rect, nr_tableau)
+            draw_tableau_specific(screen, nr_tableau, s_index, f_index)
+
+    # buttons and counters
+    if "button" in locations or "counters" in locations:
+        draw_hud(screen)
+
+    screen.set_clip(None)
+    compositor.mark(dirty_rect)
+
+
+def dirty_card_indexes(dirty_rect, nr_tableau):
+    """
+    Determines the card indexes of a tableau pile that show inside the dirty rectangle
+    (every card shows its top space_tableau pixels, the last one shows entirely).
+
+    Args:
+        dirty_rect: the rectangle that needs to be redrawn
+        nr_tableau: tableau index
+
+    Returns:
+        Starting and final indexes of the cards that need to be redrawn
+    """
+    last_index = len(state.tableau[nr_tableau]) - 1
+
+    s_index = (dirty_rect.top - tableau_height) // space_tableau
+    f_index = (dirty_rect.bottom - 1 - tableau_height) // space_tableau
+    s_index = min(max(s_index, 0), last_index)
+    f_index = min(max(f_index, s_index), last_index)
+
+    return s_index, f_index
+
+
+#  draw button
+def draw_button(x, y, text_on_button):
+    """
+    Draw a button with text on it.
+
+    Args:
+        x: x coordinate on the screen
+        y: y coordinate on the screen
+        text_on_button: text to be drawn on the button
+
+    Returns:
+        None
+    """
+    board_layer.restore(screen, (x, y, button_width, button_height))
+    compositor.mark((x, y, button_width, button_height))
+    text = text_cache.render(text_on_button, button_font_size, (0, 0, 0))
+
+    text_width, text_height = text.get_size()
+    text_x = x + (button_width - text_width) // 2
+    text_y = y + (button_height - text_height) // 2
+    screen.blit(text, (text_x, text_y))
+
+
+def draw_hud(screen):
+    """
+    Draw the buttons on the right side of the screen.
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    # RESET BUTTON
+    draw_button(reset_button_rect.x, reset_button_rect.y, "RESET")
+
+    # RULES BUTTON
+    draw_button(rules_button_rect.x, rules_button_rect.y, "RULES")
+
+    # MODE BUTTON
+    draw_button(mode_button_rect.x, mode_button_rect.y, "MODE")
+
+    # FPS AND MS
+    draw_counters(screen)
+
+
+def draw_counters(screen):
+    """
+    Draw the FPS and MS counters in the top right corner.
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    fps, ms_per_frame = hud_counters
+    clear_rect(screen, counters_rect)
+    text_cache.draw_number(
+        screen,
+        (counters_rect.x, round(10 * board_scale)),
+        "FPS: ",
+        fps,
+        counters_font_size,
+        (0, 0, 0),
+    )
+    text_cache.draw_number(
+        screen,
+        (counters_rect.x, round(50 * board_scale)),
+        "MS: ",
+        ms_per_frame,
+        counters_font_size,
+        (0, 0, 0),
+    )
+
+
+# draw rules
+def draw_rules(screen):
+    """
+    Draw the rules on the screen (pre-rendered), over the board.
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    rules_rect = (0, 0, counters_rect.x, screen.get_height())
+    rules_overlay.font_size = round(30 * board_scale)
+    rules_overlay.show(screen, rules_rect)
+    compositor.mark(rules_rect)
+
+
+def hide_rules(screen):
+    """
+    Hide the rules, putting back the board that was under them.
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    restored_rect = rules_overlay.hide(screen)
+    if restored_rect is None:
+        draw_cards(screen)
+    else:
+        compositor.mark(restored_rect)
+
+
+def drawn_card_pile(drawn_card_location, drawn_card_position):
+    """
+    Get the pile of the moving card and the index of the card in it.
+
+    Args:
+        drawn_card_location: which pile it is in ("show", "foundation", "tableau")
+        drawn_card_position: (pile index, card index in the pile)
+
+    Returns:
+        The pile (list of cards, a copy for the show pile) and the index of the
+        moving card.
+    """
+    nr_pile, index = drawn_card_position
+    return state.pile(drawn_card_location, nr_pile), index
+
+
+def draw_pile(screen, drawn_card_location, drawn_card_position):
+    """
+    Draw again the pile of the moving card (or any pile).
+
+    Args:
+        screen: pygame screen
+        drawn_card_location: which pile it is in ("stock", "show", "foundation",
+                             "tableau")
+        drawn_card_position: (pile index, card index in the pile)
+
+    Returns:
+        None
+    """
+    if drawn_card_location == "stock":
+        draw_stock(screen)
+    elif drawn_card_location == "show":
+        draw_show(screen)
+    elif drawn_card_location == "foundation":
+        draw_foundation(screen)
+    else:
+        draw_tableau(screen, drawn_card_position[0])
+
+
+def lift_cards(screen, drawn_card_location, drawn_card_position):
+    """
+    Start dragging the moving card (and the cards on it in the tableau): draw its
+    pile without them and prepare the drag layer.
+
+    Args:
+        screen: pygame screen
+        drawn_card_location: which pile it is in ("show", "foundation", "tableau")
+        drawn_card_position: (pile index, card index in the pile)
+
+    Returns:
+        None
+    """
+    pile, index = drawn_card_pile(drawn_card_location, drawn_card_position)
+    if drawn_card_location == "show":
+        pile_rect = show_rect
+    elif drawn_card_location == "foundation":
+        pile_rect = foundation_rect
+    else:
+        pile_rect = tableau_column_rect(drawn_card_position[0])
+
+    # draw the pile as it will be without the lifted cards
+    lifted = pile[index:]
+    if drawn_card_location == "show":
+        state.waste_size -= 1
+        state.show_count -= 1
+    else:
+        del pile[index:]
+    clear_rect(screen, pile_rect)
+    draw_pile(screen, drawn_card_location, drawn_card_position)
+    if drawn_card_location == "show":
+        state.waste_size += 1
+        state.show_count += 1
+    else:
+        pile.extend(lifted)
+
+    drag_layer.begin(
+        screen,
+        [card_images.card(card) for card in lifted],
+        (card_width, card_height),
+        space_tableau,
+    )
+
+
+def drop_cards(screen, destination, nr_destination):
+    """
+    Place the moving cards on a pile if the rules allow it and draw the piles that
+    changed.
+
+    Args:
+        screen: pygame screen
+        destination: the pile they are dropped on ("foundation" or "tableau")
+        nr_destination: index of that pile
+
+    Returns:
+        True/False if the cards were placed
+    """
+    pile, index = drawn_card_pile(drawn_card_location, drawn_card_position)
+    move = (
+        drawn_card_location,
+        drawn_card_position[0],
+        len(pile) - index,
+        destination,
+        nr_destination,
+    )
+    if not play_move(move):
+        return False
+
+    if destination == "foundation":
+        draw_foundation(screen)
+    else:
+        draw_tableau(screen, nr_destination)
+    start_auto_moves()
+    return True
+
+
+def card_rect(location, nr, index, count=1):
+    """
+    Get the rectangle of cards of a pile on the screen.
+
+    Args:
+        location: "stock", "show", "foundation" or "tableau"
+        nr: index of the foundation or tableau pile
+        index: index of the first card in the pile (in the show pile for "show")
+        count: number of cards from it (a tableau run)
+
+    Returns:
+        The rectangle of the cards.
+    """
+    return layout.card_rect(location, nr, index, count)
+
+
+def move_rects(move):
+    """
+    Get the rectangles of the cards a move takes and of the place they go.
+
+    Args:
+        move: (source, source_nr, count, destination, destination_nr)
+
+    Returns:
+        The list of rectangles (only the stock for a stock draw).
+    """
+    location, nr, count, to_location, to_nr = move
+    if location == "stock":
+        return [card_rect(location, nr, 0)]
+    if location == "show":
+        source = card_rect(location, nr, len(state.show_pile()) - 1)
+    else:
+        pile = state.pile(location, nr)
+        source = card_rect(location, nr, len(pile) - count, count)
+    destination = card_rect(
+        to_location, to_nr, max(len(state.pile(to_location, to_nr)) - 1, 0)
+    )
+    return [source, destination]
+
+
+def show_hint(screen):
+    """
+    Outline the cards of the best move found within the hint budget.
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    hide_hint(screen)
+    move = move_generator.best(hint_budget)
+    if move is None:
+        return
+
+    for rect in move_rects(move):
+        rect.inflate_ip(hint_border * 2, hint_border * 2)
+        pygame.draw.rect(screen, hint_color, rect, hint_border)
+        compositor.mark(rect)
+        hint_rects.append(rect)
+
+
+def hide_hint(screen):
+    """
+    Remove the outlines of the hint.
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    global hint_rects
+
+    for rect in hint_rects:
+        draw_dirty_portion(screen, rect)
+    hint_rects = []
+
+
+# undo the last move / redo the last move undone
+undo_key = pygame.K_z
+redo_key = pygame.K_y
+
+
+def pile_rect(location, nr):
+    """
+    Get the rectangle of a pile on the screen.
+
+    Args:
+        location: "stock", "show", "foundation" or "tableau"
+        nr: index of the foundation or tableau pile
+
+    Returns:
+        The rectangle of the pile.
+    """
+    if location == "stock":
+        return pygame.Rect(stock_rect)
+    if location == "show":
+        return pygame.Rect(show_rect)
+    if location == "foundation":
+        return card_rect(location, nr, 0)
+    return tableau_column_rect(nr)
+
+
+def step_move(screen, redo=False):
+    """
+    Undo the last move (or redo the last move undone) and draw again the two piles
+    it changed.
+
+    Args:
+        screen: pygame screen
+        redo: True to redo, False to undo
+
+    Returns:
+        None
+    """
+    move = move_log.redo_move() if redo else move_log.undo_move()
+    if move is None:
+        return
+    stop_auto_moves()
+
+    piles = move_piles(move)
+    rects = [pile_rect(location, nr) for location, nr in piles]
+    won = state.won()
+    if redo:
+        move_log.redo()
+    else:
+        move_log.undo()
+    move_generator.touch(move)
+    if recorder and redo:
+        recorder.redo()
+    elif recorder:
+        recorder.undo()
+
+    if won:
+        # the end game message goes away with the whole board
+        draw_cards(screen)
+        return
+    draw_piles(screen, piles, rects)
+
+
+def replay_move(screen, move):
+    """
+    Make a move the player did not drag (a move of a replay or one the game makes by
+    itself) and draw again the two piles it changed.
+
+    Args:
+        screen: pygame screen
+        move: (source, source_nr, count, destination, destination_nr)
+
+    Returns:
+        True/False if the move was made
+    """
+    piles = move_piles(move)
+    rects = [pile_rect(location, nr) for location, nr in piles]
+    if not play_move(move):
+        return False
+    draw_piles(screen, piles, rects)
+    return True
+
+
+def move_piles(move):
+    """
+    Get the two piles a move changes.
+
+    Args:
+        move: (source, source_nr, count, destination, destination_nr)
+
+    Returns:
+        The list of (location, nr) of the piles.
+    """
+    return [(move[0], move[1]), (move[3], move[4])]
+
+
+def draw_piles(screen, piles, rects):
+    """
+    Draw again piles that changed, clearing where they were and where they are.
+
+    Args:
+        screen: pygame screen
+        piles: list of (location, nr) of the piles
+        rects: the rectangles of the piles before they changed
+
+    Returns:
+        None
+    """
+    for (location, nr), rect in zip(piles, rects):
+        clear_rect(screen, rect.union(pile_rect(location, nr)))
+        draw_pile(screen, location, (nr, 0))
+
+
+# the game finishes by itself once every card is face up (auto-complete); with
+# auto-play on, it also moves the safe cards to the foundation as they come up
+auto_play_key = pygame.K_a
+auto_move_delay = 60  # ms between two moves made by the game
+
+
+def start_auto_moves():
+    """
+    Let the game look for moves to make by itself (after a move of the player, the
+    moves of the auto-complete are computed again).
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    global auto_active, auto_moves
+
+    auto_active = True
+    auto_moves = []
+
+
+def stop_auto_moves():
+    """
+    Stop the moves made by the game (after an undo or a new game).
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    global auto_active, auto_moves
+
+    auto_active = False
+    auto_moves = []
+
+
+def next_auto_move():
+    """
+    Get the next move the game makes by itself: the moves of the auto-complete,
+    computed all at once when the game can be auto-completed, or a safe move to the
+    foundation when auto-play is on.
+
+    Args:
+        None
+
+    Returns:
+        The move, None if there is none.
+    """
+    global auto_moves
+
+    if not auto_moves and moves.can_auto_complete(state) and not state.won():
+        # kept with the next move last
+        auto_moves = moves.auto_complete_moves(state)[::-1]
+    if auto_moves:
+        return auto_moves.pop()
+    if auto_play:
+        return moves.safe_foundation_move(state)
+    return None
+
+
+def auto_step(screen):
+    """
+    Make the next move of the game (at most one every auto_move_delay), drawing
+    again only the two piles it changed.
+
+    Args:
+        screen: pygame screen
+
+    Returns:
+        None
+    """
+    global auto_time
+
+    if not auto_active or drawn_card is not None or rules_drawn:
+        return
+    now = pygame.time.get_ticks()
+    if now - auto_time < auto_move_delay:
+        return
+
+    move = next_auto_move()
+    if move is None or not replay_move(screen, move):
+        stop_auto_moves()
+        return
+    auto_time = now
+
+
+def resize_board(screen, size):
+    """
+    Scale the board to the size of the window and draw it again.
+
+    Args:
+        screen: pygame screen
+        size: (width, height) of the window
+
+    Returns:
+        None
+    """
+    global card_images
+
+    scale = fit_scale(size)
+    if scale != board_scale:
+        set_board_scale(scale)
+        card_images = card_asset_sets.get((card_width, card_height))
+
+    compositor.screen = screen
+    draw_cards(screen)
+    if rules_drawn:
+        draw_rules(screen)
+
+
+def pick_card(card_x, card_y, position):
+    """
+    Update offsets for moving card
+
+    Args:
+        card_x: last x coordinate on the screen of the card
+        card_y: last y coordinate on the screen of the card
+        position: current card position
+
+    Returns:
+        The updated offsets
+    """
+    offset_x = card_x - position[0]
+    offset_y = card_y - position[1]
+
+    return offset_x, offset_y
+
+
+def move_card(offset_x, offset_y, position):
+    """
+    Update the position coordinates  of the card.
+
+    Args:
+        offset_x: offset x of the card
+        offset_y: offset y of the card
+        position: current card position
+
+    Returns:
+        The updated coordinates of the card
+    """
+    card_x = position[0] + offset_x
+    card_y = position[1] + offset_y
+
+    return card_x, card_y
+
+
+def set_moving(width, height, event):
+    """
+    Set the card as moving and update coordinates
+
+    Args:
+        width: current x of the card
+        height: current y of the card
+        event: the event (mouseclick)
+
+
+    Returns:
+        None
+    """
+    global moving, drawn_card_x, drawn_card_y, offset_x, offset_y
+    moving = True
+    drawn_card_x, drawn_card_y = width, height
+    offset_x, offset_y = pick_card(width, height, event.pos)
+
+
+# TEST
+# card1=Card(7,"clubs")
+# card2=Card(13,"hearts")
+# card2.flip()
+
+# for j in range(0,4):
+#     for i in range(0,13):
+#         foundation[j].append(card2)
+
+
+# SOLITAIRE
+# the window and the caches, created by start_game()
+screen = None
+card_images = None
+compositor = None
+drag_layer = None
+text_cache = None
+rules_overlay = None
+clock = None
+frame_policy = None
+profiler = None
+
+# the phase timings are written here on exit and when profile_key is pressed
+profile_filename = "frame_profile.csv"
+profile_key = pygame.K_F3
+
+# the hint: the best move is outlined when hint_key is pressed, until the next click
+hint_key = pygame.K_h
+hint_budget = 0.008  # s, half a frame at 60 fps
+hint_color = (255, 220, 0)
+hint_border = 3
+hint_rects = []
+
+auto_play = False
+auto_active = False  # the game may have moves to make by itself
+auto_moves = []  # the moves of the auto-complete still to make, the next one last
+auto_time = 0  # time of the last move made by the game
+
+moving = False
+drawn_card = None
+game_mode = 3
+game_seed = None  # seed of the deal being played
+
+# the winnable deals of each game mode, mapped by start_game()
+winnable_deals = {}
+
+# the replay of the games played (None when they are not recorded)
+recorder = None
+
+drawn_card_location = None  # "show", "foundation" or "tableau"
+drawn_card_position = None  # (index of the pile, index of the card in the pile)
+
+rules_drawn = False
+
+hud_counters = (0, 0)  # (fps, ms) drawn in the top right corner
+
+dirty_rect = None
+
+# the board is scaled only once the window size stops changing
+resize_pending = None  # new window size
+resize_time = 0  # time of the last VIDEORESIZE
+resize_settle_time = 250  # ms
+
+
+def start_game(
+    size=(base_board_width, base_board_height),
+    flags=pygame.RESIZABLE,
+    resume=False,
+    record=False,
+):
+    """
+    Start pygame, open the window, prepare the caches and deal a new game (or go on
+    with the saved one).
+
+    Args:
+        size: (width, height) of the window
+        flags: pygame display flags
+        resume: True to go on with the game saved on exit, if there is one
+        record: True to record the games in a new replay file (see replay.py)
+
+    Returns:
+        The pygame screen.
+    """
+    global screen, card_images, compositor, drag_layer, text_cache, rules_overlay
+    global clock, frame_policy, profiler, hint_rects
+    global winnable_deals, game_mode, game_seed, recorder
+
+    # start pygame
+    pygame.init()
+
+    # window
+    screen = pygame.display.set_mode(size, flags)
+    pygame.display.set_caption("Solitaire")
+    if tuple(size) != (base_board_width, base_board_height):
+        set_board_scale(fit_scale(size))
+    card_images = card_asset_sets.get((card_width, card_height))
+    compositor = Compositor(screen)
+    drag_layer = DragLayer()
+
+    # labels rendered once, the counters are drawn from cached digits
+    text_cache = TextCache()
+    text_cache.preload(["RESET", "RULES", "MODE"], button_font_size, (0, 0, 0))
+    text_cache.preload(
+        ["FPS: ", "MS: "] + list("0123456789"), counters_font_size, (0, 0, 0)
+    )
+    text_cache.preload(["CONGRATULATIONS, YOU WON!"], banner_font_size, (255, 150, 0))
+
+    # rules read in the background and rendered once, shown with a blit; the overlay
+    # and its watcher thread are made by the first start_game only
+    if rules_overlay is None:
+        rules_overlay = RulesOverlay(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.txt"),
+            (20, 150, 50),
+            (0, 0, 0),
+            text_cache,
+        )
+    else:
+        rules_overlay.text_cache = text_cache
+        rules_overlay.overlay = None
+
+    clock = pygame.time.Clock()
+    # full frame rate only while cards move, otherwise wait for events
+    frame_policy = FramePolicy(active_fps=60, idle_timeout=1000)
+    profiler = PhaseProfiler(
+        ["frame", "events", "resize", "restore", "drag", "hud", "update"]
+    )
+
+    # deal and draw the board
+    winnable_deals = {
+        draw_count: deal_index.DealIndex(deal_index.index_path(draw_count), draw_count)
+        for draw_count in (1, 3)
+    }
+    recorder = replay.ReplayRecorder(replay.new_replay_path()) if record else None
+    saved = savegame.load() if resume else None
+    if saved and not saved[0].won():
+        # the piles come straight from the save, no deck is dealt
+        set_state(saved[0])
+        game_mode, game_seed = state.draw_count, saved[1]
+        pygame.display.set_caption(f"Solitaire #{game_seed}")
+        if recorder:
+            recorder.snapshot(state, game_seed)
+        start_auto_moves()
+    else:
+        deal_game("start")
+    hint_rects = []
+    draw_cards(screen)
+
+    return screen
+
+
+def handle_event(event):
+    """
+    Handle one pygame event (resize, clicks on the piles and buttons, card moves).
+
+    Args:
+        event: the pygame event
+
+    Returns:
+        None
+    """
+    global screen, game_mode, rules_drawn, resize_pending, resize_time, hint_rects
+    global drawn_card, drawn_card_location, drawn_card_position
+    global drawn_card_x, drawn_card_y, moving, auto_play, dirty_rect
+
+    if event.type == pygame.VIDEORESIZE:
+        # the board is drawn again once the size settled (see draw_frame)
+        resize_pending = event.size
+        resize_time = pygame.time.get_ticks()
+        screen = pygame.display.get_surface()
+        compositor.screen = screen
+        hint_rects = []
+        if drawn_card is not None:
+            # the snapshot of the drag is of the old surface: drop the drag, the
+            # cards go back to their pile with the full redraw
+            drag_layer.end()
+            drawn_card = None
+            moving = False
+            dirty_rect = None
+    elif event.type == pygame.MOUSEBUTTONDOWN:
+        if event.button == 1:  # Left mouse button
+            hide_hint(screen)
+
+            # the pile or button under the mouse
+            region = layout.regions.at(event.pos)
+
+            # click on stock_pile
+            if not rules_drawn and region == ("stock", 0):
+                play_move(engine.draw_move)
+
+                # draw stock and show again
+                portion_rect = pygame.Rect(
+                    stock_width,
+                    stock_height,
+                    show_width + card_width + space_show * 2,
+                    card_height,
+                )
+                clear_rect(screen, portion_rect)
+                draw_show(screen)
+                draw_stock(screen)
+                start_auto_moves()
+
+            # RESET BUTTON
+            elif region == ("button", "reset"):
+                deal_game("reset")
+                draw_cards(screen)
+                rules_drawn = False
+
+            # RULES BUTTON
+            elif region == ("button", "rules"):
+                if rules_drawn:
+                    hide_rules(screen)
+                    rules_drawn = False
+                else:
+                    draw_rules(screen)
+                    rules_drawn = True
+
+            elif region == ("button", "mode"):
+
+                # change game mode
+                if game_mode == 3:
+                    game_mode = 1
+                elif game_mode == 1:
+                    game_mode = 3
+
+                # reset game
+                deal_game("mode")
+                draw_cards(screen)
+                rules_drawn = False
+
+            # the rules cover the board, no card can be picked
+            if rules_drawn:
+                return
+
+            # pick a card of the show pile, the foundation or the tableau
+            picked = layout.card_at(event.pos, state)
+            if picked is not None:
+                location, nr, index = picked
+                rect = layout.card_rect(location, nr, index)
+                set_moving(rect.x, rect.y, event)
+                drawn_card = state.pile(location, nr)[index]
+                drawn_card_location = location
+                drawn_card_position = (nr, index)
+
+            # lift the picked cards off the board
+            if drawn_card is not None:
+                lift_cards(screen, drawn_card_location, drawn_card_position)
+
+    elif event.type == pygame.MOUSEBUTTONUP:
+        moving = False
+
+        if drawn_card is not None:
+            # the pile under the middle of the card
+            target = layout.drop_target(
+                (drawn_card_x + card_width // 2, drawn_card_y + card_height // 2),
+                state,
+            )
+            if target is not None:
+                drop_cards(screen, *target)
+
+            # the pile the cards came from: without them, or with them back if they
+            # were not placed
+            draw_pile(screen, drawn_card_location, drawn_card_position)
+
+            # drawn_card will dissapear
+            drag_layer.end()
+            drawn_card = None
+
+    elif event.type == pygame.MOUSEMOTION:
+        if moving:
+            drawn_card_x, drawn_card_y = move_card(offset_x, offset_y, event.pos)
+
+    elif event.type == pygame.KEYDOWN and event.key == profile_key:
+        profiler.dump(profile_filename)
+        print(profiler.report())
+        print(compositor.report())
+
+    elif (
+        event.type == pygame.KEYDOWN
+        and event.key == hint_key
+        and drawn_card is None
+        and not rules_drawn
+    ):
+        show_hint(screen)
+
+    elif (
+        event.type == pygame.KEYDOWN
+        and event.key in (undo_key, redo_key)
+        and drawn_card is None
+        and not rules_drawn
+    ):
+        hide_hint(screen)
+        step_move(screen, event.key == redo_key)
+
+    elif event.type == pygame.KEYDOWN and event.key == auto_play_key:
+        auto_play = not auto_play
+        if auto_play:
+            start_auto_moves()
+
+
+def draw_frame():
+    """
+    Draw what changed in this frame: the board after a resize, the move made by the
+    game, the moving cards, the end game message and the counters.
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    global resize_pending, dirty_rect, hud_counters
+
+    # scale the board once the window size settled (and no cards are moving)
+    if (
+        resize_pending
+        and drawn_card is None
+        and pygame.time.get_ticks() - resize_time >= resize_settle_time
+    ):
+        profiler.start("resize")
+        resize_board(screen, resize_pending)
+        resize_pending = None
+        profiler.stop("resize")
+
+    # the moves the game makes by itself, one at a time
+    auto_step(screen)
+
+    # Clear the screen only for dirty rect (the moving cards)
+    if dirty_rect:
+        profiler.start("restore")
+        if drag_layer.active():
+            # the board under the moving cards did not change since they were lifted
+            drag_layer.restore(screen, dirty_rect)
+            compositor.mark(dirty_rect)
+            if dirty_rect.colliderect(counters_rect):
+                draw_counters(screen)
+        else:
+            draw_dirty_portion(screen, dirty_rect)
+        dirty_rect = None
+        profiler.stop("restore")
+
+    # Draw the moving cards if they exist
+    if drawn_card is not None:
+        profiler.start("drag")
+        # Calculate the dirty rect for the drawn cards
+        dirty_rect = drag_layer.draw(screen, (drawn_card_x, drawn_card_y))
+        compositor.mark(dirty_rect)
+        profiler.stop("drag")
+
+    profiler.start("hud")
+    # END GAME
+    if state.won():
+        text_surface = text_cache.render(
+            "CONGRATULATIONS, YOU WON!", banner_font_size, (255, 150, 0)
+        )
+        screen.blit(text_surface, banner_position)
+        compositor.mark(text_surface.get_rect(topleft=banner_position))
+
+    # FPS AND MS (redrawn only when they change)
+    fps = clock.get_fps()
+    fps = int(fps) if math.isfinite(fps) else 0  # frames closer than 1 ms when idle
+    ms_per_frame = clock.get_time()
+
+    if (fps, ms_per_frame) != hud_counters:
+        hud_counters = (fps, ms_per_frame)
+        draw_counters(screen)
+    profiler.stop("hud")
+
+
+def save_game():
+    """
+    Save the game being played, to go on with it at the next start (a won game is
+    not kept).
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    try:
+        if state.won():
+            savegame.remove()
+        else:
+            savegame.save(state, game_seed)
+    except OSError as error:
+        print(f"the game could not be saved: {error}")
+
+
+def main():
+    """
+    Open the window and run the game loop until the window is closed.
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    start_game(resume=True, record=True)
+
+    # main game loop
+    while True:
+        busy = drawn_card is not None or resize_pending is not None or auto_active
+        events = frame_policy.events(busy)
+
+        # the time spent waiting for the events is not part of the frame
+        profiler.start("frame")
+        profiler.start("events")
+        for event in events:
+            if event.type == pygame.QUIT:
+                save_game()
+                recorder.close()
+                rules_overlay.close()
+                print(frame_policy.report())
+                print(profiler.report())
+                print(card_images.report())
+                print(card_asset_sets.report())
+                print(compositor.report())
+                profiler.dump(profile_filename)
+                pygame.quit()
+                sys.exit()
+            handle_event(event)
+        profiler.stop("events")
+
+        draw_frame()
+
+        # send only the changed regions to the display
+        profiler.start("update")
+        pygame.display.update(compositor.flush())
+        profiler.stop("update")
+        profiler.stop("frame")
+        frame_policy.tick(clock, busy or drawn_card is not None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import argparse
+import time
+
+import engine
+from moves import (
+    all_moves,
+    auto_complete_moves,
+    can_auto_complete,
+    move_score,
+    safe_foundation_move,
+)
+
+
+def state_key(state):
+    """
+    Get the key of a position in the transposition table. Positions that only
+    differ by the order of the tableau columns or of the foundation piles get the
+    same key.
+
+    Args:
+        state: the GameState
+
+    Returns:
+        The hashable key.
+    """
+    return (
+        bytes(state.stock_cards()),
+        bytes(state.waste_cards()),
+        state.show_count,
+        tuple(sorted(pile[-1] for pile in state.foundation if pile)),
+        tuple(
+            sorted(
+                (bytes(column), hidden)
+                for column, hidden in zip(state.tableau, state.hidden)
+            )
+        ),
+    )
+
+
+def finishing_moves(state):
+    """
+    Play the moves that win a game whose cards are all face up in the tableau and
+    the foundation (see moves.auto_complete_moves).
+
+    Args:
+        state: the GameState (it is played to the end)
+
+    Returns:
+        The list of moves.
+    """
+    finish = auto_complete_moves(state)
+    for move in finish:
+        state.apply(move)
+    return finish
+
+
+def play_safe_moves(state):
+    """
+    Play the safe foundation moves of a position, one after the other.
+
+    Args:
+        state: the GameState (the moves are played on it)
+
+    Returns:
+        The list of moves played.
+    """
+    played = []
+    safe = safe_foundation_move(state)
+    while safe is not None:
+        state.apply(safe)
+        played.append(safe)
+        safe = safe_foundation_move(state)
+    return played
+
+
+class SolveResult:
+    """
+    The class SolveResult is the outcome of a search: "win" with the winning moves,
+    "loss" when every position was searched, "unknown" when a limit was reached
+    first, and the counters of the search.
+    """
+
+    def __init__(self, status, moves, nodes, seconds, lookups, hits):
+        """
+        SolveResult constructor
+
+        Args:
+            self: refer to the current instance
+            status: "win", "loss" or "unknown"
+            moves: the moves that win the game from the start position (None if not won)
+            nodes: positions searched
+            seconds: time of the search
+            lookups: transposition table lookups
+            hits: lookups that found a position already searched
+
+        Returns:
+            None
+        """
+        self.status = status
+        self.moves = moves
+        self.nodes = nodes
+        self.seconds = seconds
+        self.lookups = lookups
+        self.hits = hits
+
+    def nodes_per_second(self):
+        """
+        Get the speed of the search.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            Positions searched per second.
+        """
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    def hit_rate(self):
+        """
+        Get the part of the table lookups that found a position already searched.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The hit rate (0..1).
+        """
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def report(self):
+        """
+        Describe the result in one line.
+
+        Args:
+            self: refer to the current instance
+
+        Returns:
+            The text of the result.
+        """
+        moves = len(self.moves) if self.moves is not None else "-"
+        return (
+            f"{self.status}: {moves} moves, {self.nodes} nodes in "
+            f"{self.seconds:.2f} s ({self.nodes_per_second():.0f} nodes/s), "
+            f"table hit rate {100 * self.hit_rate():.1f}%"
+        )
+
+
+class Solver:
+    """
+    The class Solver decides if a game can be won, knowing where every card is
+    (the face down cards included). It is a depth first search over the positions,
+    trying the best rated moves first (moves.move_score) and playing the safe
+    foundation moves at once (see safe_foundation_move). Every position reached is
+    kept in a transposition table, so it is searched only once.
+    """
+
+    def __init__(self, max_nodes=200000, max_seconds=10.0):
+        """
+        Solver constructor
+
+        Args:
+            self: refer to the current instance
+            max_nodes: positions searched before giving up (None for no limit)
+            max_seconds: time before giving up (None for no limit)
+
+        Returns:
+            None
+        """
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+
+    def children(self, state):
+        """
+        Get the moves to search from a position, the best rated first. A king
+        that is already at the bottom of its column is not moved to an empty one.
+
+        Args:
+            self: refer to the current instance
+            state: the GameState
+
+        Returns:
+            The list of moves.
+        """
+        rated = [(move_score(state, move), move) for move in all_moves(state)]
+        rated.sort(key=lambda item: item[0], reverse=True)
+        return [move for score, move in rated if score > -100]
+
+    def solve(self, state):
+        """
+        Search the moves that win a game.
+
+        Args:
+            self: refer to the current instance
+            state: the GameState to solve (it is not changed)
+
+        Returns:
+            The SolveResult.
+        """
+        start = time.perf_counter()
+        deadline = start + self.max_seconds if self.max_seconds is not None else None
+        table = set()
+        nodes = lookups = hits = 0
+
+        # the safe moves of the start position are played as well
+        state = state.copy()
+        played = play_safe_moves(state)
+
+        if can_auto_complete(state):
+            played += finishing_moves(state)
+            return SolveResult("win", played, 0, time.perf_counter() - start, 0, 0)
+
+        # one frame per position on the current path: (state, moves left to try,
+        # moves that led to it)
+        stack = [(state, iter(self.children(state)), played)]
+        table.add(state_key(state))
+        status = "loss"
+        while stack:
+            if (self.max_nodes is not None and nodes >= self.max_nodes) or (
+                deadline is not None
+                and nodes % 256 == 0
+                and time.perf_counter() > deadline
+            ):
+                status = "unknown"
+                break
+
+            state, moves_left, _ = stack[-1]
+            move = next(moves_left, None)
+            if move is None:
+                stack.pop()
+                continue
+
+            # the safe moves follow from the position: the table is looked up
+            # before they are played, and again after if there were any
+            child = state.copy()
+            child.apply(move)
+            key = state_key(child)
+            lookups += 1
+            if key in table:
+                hits += 1
+                continue
+            table.add(key)
+            played = [move] + play_safe_moves(child)
+            if len(played) > 1:
+                key = state_key(child)
+                lookups += 1
+                if key in table:
+                    hits += 1
+                    continue
+                table.add(key)
+            nodes += 1
+
+            if can_auto_complete(child):
+                played += finishing_moves(child)
+                solution = [move for frame in stack for move in frame[2]] + played
+                return SolveResult(
+                    "win",
+                    solution,
+                    nodes,
+                    time.perf_counter() - start,
+                    lookups,
+                    hits,
+                )
+            stack.append((child, iter(self.children(child)), played))
+
+        return SolveResult(
+            status, None, nodes, time.perf_counter() - start, lookups, hits
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Decide if seeded deals can be won.")
+    parser.add_argument("seeds", type=int, nargs="+", help="seeds of the deals")
+    parser.add_argument("--mode", type=int, choices=[1, 3], default=3)
+    parser.add_argument("--nodes", type=int, default=200000, help="node limit")
+    parser.add_argument("--seconds", type=float, default=10.0, help="time limit")
+    parser.add_argument("--moves", action="store_true", help="print the solutions")
+    args = parser.parse_args()
+
+    solver = Solver(args.nodes, args.seconds)
+    for seed in args.seeds:
+        result = solver.solve(engine.seeded_game(seed, args.mode))
+        print(f"seed {seed}: {result.report()}")
+        if args.moves and result.moves:
+            for move in result.moves:
+                print("   ", move)